@@ -0,0 +1,162 @@
+import numpy as np
+from scipy.stats import chi2, kstwo, norm
+
+
+class StreamingTestBattery:
+    """Online uniformity and randomness tests for U(0,1) draws fed in chunks.
+
+    Draws are counted in bins * refine fine bins, so the Kolmogorov-Smirnov D
+    can fall short of the exact statistic by up to 1 / (bins * refine). With
+    n_expected given and refine left at None, refine is chosen so that this
+    is at most 1% of 1/sqrt(n), the scale of D under the null (capped at
+    2**24 fine bins); otherwise refine defaults to 4096.
+    """
+
+    def __init__(self, bins=20, refine=None, gap_low=0.0, gap_high=0.5, gap_classes=10,
+                 n_expected=None):
+        if refine is None:
+            refine = 4096
+            if n_expected:
+                Wanted = int(np.ceil(100 * np.sqrt(n_expected) / bins))
+                refine = min(max(refine, Wanted), 2**24 // bins)
+        self.bins = bins
+        self.fine_bins = bins * refine
+        self.gap_low = gap_low
+        self.gap_high = gap_high
+        self.gap_classes = gap_classes
+        self.counts = np.zeros(self.fine_bins, dtype=np.int64)
+        self.n = 0
+        # serial correlation sums
+        self.sum_x = 0.0
+        self.sum_xx = 0.0
+        self.sum_lag = 0.0
+        self.first = None
+        self.last = None
+        # runs above/below 0.5
+        self.n_above = 0
+        self.runs = 0
+        # gap test
+        self.gap_counts = np.zeros(gap_classes + 1, dtype=np.int64)
+        self.current_gap = 0
+        self.seen_hit = False
+
+    def update(self, u):
+        u = np.asarray(u, dtype=np.float64).ravel()
+        if u.size == 0:
+            return self
+        Idx = np.minimum((u * self.fine_bins).astype(np.int64), self.fine_bins - 1)
+        self.counts += np.bincount(Idx, minlength=self.fine_bins)
+
+        self.sum_x += u.sum()
+        self.sum_xx += np.dot(u, u)
+        self.sum_lag += np.dot(u[:-1], u[1:])
+        if self.last is not None:
+            self.sum_lag += self.last * u[0]
+        else:
+            self.first = u[0]
+
+        Above = u >= 0.5
+        self.n_above += int(Above.sum())
+        self.runs += int(np.count_nonzero(Above[1:] != Above[:-1]))
+        if self.last is None:
+            self.runs += 1
+        elif (self.last >= 0.5) != Above[0]:
+            self.runs += 1
+
+        Hits = np.flatnonzero((u >= self.gap_low) & (u < self.gap_high))
+        if Hits.size:
+            Gaps = np.diff(Hits) - 1
+            if self.seen_hit:
+                Gaps = np.concatenate(([Hits[0] + self.current_gap], Gaps))
+            self.gap_counts += np.bincount(np.minimum(Gaps, self.gap_classes),
+                                           minlength=self.gap_classes + 1)
+            self.current_gap = u.size - Hits[-1] - 1
+            self.seen_hit = True
+        else:
+            self.current_gap += u.size
+
+        self.last = u[-1]
+        self.n += u.size
+        return self
+
+    def chi_square(self):
+        Counts = self.counts.reshape(self.bins, -1).sum(axis=1)
+        Expected = self.n / self.bins
+        V = ((Counts - Expected)**2 / Expected).sum()
+        return V, chi2.sf(V, self.bins - 1)
+
+    def serial_correlation(self):
+        # circular lag-1 estimator, approximately N(-1/(n-1), 1/n) under independence
+        n = self.n
+        Lag = self.sum_lag + self.last * self.first
+        Num = n * Lag - self.sum_x**2
+        Den = n * self.sum_xx - self.sum_x**2
+        R = Num / Den
+        Z = (R + 1.0 / (n - 1)) * np.sqrt(n)
+        return R, 2 * norm.sf(abs(Z))
+
+    def runs_test(self):
+        n1 = self.n_above
+        n2 = self.n - n1
+        Mu = 2.0 * n1 * n2 / self.n + 1
+        Var = (Mu - 1) * (Mu - 2) / (self.n - 1)
+        Z = (self.runs - Mu) / np.sqrt(Var)
+        return self.runs, 2 * norm.sf(abs(Z))
+
+    def gap_test(self):
+        p = self.gap_high - self.gap_low
+        Total = self.gap_counts.sum()
+        k = np.arange(self.gap_classes)
+        Probs = np.append(p * (1 - p)**k, (1 - p)**self.gap_classes)
+        Expected = Total * Probs
+        V = ((self.gap_counts - Expected)**2 / Expected).sum()
+        return V, chi2.sf(V, self.gap_classes)
+
+    def ks_test(self):
+        # sup |F_n - F| on the fine grid, a lower bound short by at most 1/fine_bins
+        Edges = np.arange(1, self.fine_bins + 1) / self.fine_bins
+        Ecdf = np.cumsum(self.counts) / self.n
+        Lower = np.concatenate(([0.0], Ecdf[:-1]))
+        D = max(np.max(Ecdf - Edges), np.max(Edges - 1.0 / self.fine_bins - Lower))
+        D = max(D, 0.0)
+        return D, kstwo.sf(D, self.n)
+
+    def report(self):
+        return {
+            'chi-square': self.chi_square(),
+            'serial correlation': self.serial_correlation(),
+            'runs': self.runs_test(),
+            'gap': self.gap_test(),
+            'Kolmogorov-Smirnov': self.ks_test(),
+        }
+
+
+def run_battery(draw, n, chunk_size=2**20, **kwargs):
+    kwargs.setdefault('n_expected', n)
+    Battery = StreamingTestBattery(**kwargs)
+    Remaining = n
+    while Remaining > 0:
+        Size = min(chunk_size, Remaining)
+        Battery.update(draw(Size))
+        Remaining -= Size
+    return Battery
+
+
+def print_report(Battery):
+    print("Draws tested = ", Battery.n)
+    for Name, (Stat, PValue) in Battery.report().items():
+        print("%-20s statistic = %14.6g   p-value = %.4f" % (Name, Stat, PValue))
+    print("KS statistic resolution = %.2g (1/sqrt(n) = %.2g)" %
+          (1.0 / Battery.fine_bins, 1.0 / np.sqrt(Battery.n)))
+
+
+if __name__ == '__main__':
+    from CongruentialEngine import lewis_learmonth_miller
+
+    Engine = lewis_learmonth_miller(seed=1)
+    print_report(run_battery(Engine.random, 10**7))
+
+    # the book's generator parameters fail badly, as expected for m = 5
+    from CongruentialEngine import LCGEngine
+    Poor = LCGEngine(2, 4, 5, seed=3)
+    print_report(run_battery(Poor.random, 10**5))
@@ -0,0 +1,231 @@
+import os
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from scipy.optimize import minimize_scalar
+from scipy.stats import norm
+
+MCResult = namedtuple('MCResult', ['estimate', 'std_error', 'conf_int', 'n', 'sample'])
+
+
+class RunningMoments:
+    """Welford mean/variance accumulator that merges batches with Chan's update."""
+
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def add_batch(self, n, mean, m2):
+        if n == 0:
+            return self
+        Total = self.n + n
+        Delta = mean - self.mean
+        self.mean += Delta * n / Total
+        self.m2 += m2 + Delta**2 * self.n * n / Total
+        self.n = Total
+        return self
+
+    def update(self, Values):
+        Values = np.asarray(Values, dtype=np.float64)
+        Mean = Values.mean()
+        return self.add_batch(Values.size, Mean, ((Values - Mean)**2).sum())
+
+    @property
+    def variance(self):
+        return self.m2 / (self.n - 1) if self.n > 1 else np.inf
+
+    @property
+    def std_error(self):
+        return np.sqrt(self.variance / self.n)
+
+
+def evaluate(f, x):
+    # one-dimensional integrands get a flat array, like the book's f = lambda x: x**2
+    return np.asarray(f(x[0] if x.shape[0] == 1 else x), dtype=np.float64)
+
+
+def _uniform_points(Gen, Low, High, size):
+    return Low[:, None] + (High - Low)[:, None] * Gen.random((Low.size, size))
+
+
+def _integrate_chunk(Task):
+    f, Low, High, size, Seed, keep, Offset, source = Task
+    Gen = np.random.Generator(np.random.Philox(Seed))
+    X = _uniform_points(source(Seed, Offset) if source else Gen, Low, High, size)
+    Y = evaluate(f, X)
+    Mean = Y.mean()
+    M2 = ((Y - Mean)**2).sum()
+    Sample = None
+    if keep:
+        Pick = Gen.choice(size, size=min(keep, size), replace=False)
+        Sample = (X[:, Pick], Y[Pick])
+    return size, Mean, M2, Sample
+
+
+def merge_reservoirs(Gen, First, Second, keep):
+    # each reservoir is a uniform subset of (points, values) seen so far with its population size
+    (n1, S1), (n2, S2) = First, Second
+    if S1 is None:
+        return n1 + n2, S2
+    if S2 is None:
+        return n1 + n2, S1
+    k = min(keep, S1[1].size + S2[1].size)
+    k1 = Gen.hypergeometric(n1, n2, k)
+    k1 = min(max(k1, k - S2[1].size), S1[1].size)
+    Pick1 = Gen.choice(S1[1].size, size=k1, replace=False)
+    Pick2 = Gen.choice(S2[1].size, size=k - k1, replace=False)
+    return n1 + n2, (np.concatenate((S1[0][:, Pick1], S2[0][:, Pick2]), axis=1),
+                     np.concatenate((S1[1][Pick1], S2[1][Pick2])))
+
+
+def chunk_sizes(n, chunk_size):
+    Sizes = [chunk_size] * (n // chunk_size)
+    if n % chunk_size:
+        Sizes.append(n % chunk_size)
+    return Sizes
+
+
+def mc_integrate(f, bounds, n, chunk_size=2**20, workers=1, seed=None, keep=0,
+                 confidence=0.95, source=None):
+    """Sample-mean Monte Carlo integral of a vectorized f over a box.
+
+    Each chunk draws from its own Philox stream spawned from one SeedSequence,
+    so the estimate does not depend on how many workers are used. With
+    workers > 1, f must be picklable (a module-level function, not a lambda).
+
+    source, if given, replaces the pseudo-random draws: source(Seed, Offset)
+    must return an object whose random((d, n)) yields the chunk's points,
+    Offset being the index of the chunk's first point in the whole run.
+    """
+    Bounds = np.atleast_2d(np.asarray(bounds, dtype=np.float64))
+    Low, High = Bounds[:, 0], Bounds[:, 1]
+    Volume = np.prod(High - Low)
+    Sizes = chunk_sizes(n, chunk_size)
+    Root = np.random.SeedSequence(seed)
+    Seeds = Root.spawn(len(Sizes))
+    Offsets = np.cumsum([0] + Sizes[:-1])
+    Tasks = [(f, Low, High, s, ss, keep, int(o), source)
+             for s, ss, o in zip(Sizes, Seeds, Offsets)]
+
+    if workers == 1:
+        Results = map(_integrate_chunk, Tasks)
+        return _collect(Results, Volume, Root, keep, confidence)
+    with ProcessPoolExecutor(max_workers=workers) as Pool:
+        Results = Pool.map(_integrate_chunk, Tasks)
+        return _collect(Results, Volume, Root, keep, confidence)
+
+
+def _collect(Results, Volume, Root, keep, confidence):
+    Moments = RunningMoments()
+    Reservoir = (0, None)
+    MergeGen = np.random.Generator(np.random.Philox(Root.spawn(1)[0]))
+    for Size, Mean, M2, Sample in Results:
+        Moments.add_batch(Size, Mean, M2)
+        if keep:
+            Reservoir = merge_reservoirs(MergeGen, Reservoir, (Size, Sample), keep)
+    Estimate = Volume * Moments.mean
+    StdError = Volume * Moments.std_error
+    Z = norm.ppf(0.5 + confidence / 2)
+    return MCResult(Estimate, StdError, (Estimate - Z * StdError, Estimate + Z * StdError),
+                    Moments.n, Reservoir[1])
+
+
+def function_range(f, a, b, grid=1001):
+    """Bounding values of a 1-D f on [a, b]: vectorized grid scan polished by a bounded search."""
+    X = np.linspace(a, b, grid)
+    Y = np.asarray(f(X), dtype=np.float64)
+    Step = (b - a) / (grid - 1)
+    Extremes = []
+    for Sign, i in ((1.0, np.argmin(Y)), (-1.0, np.argmax(Y))):
+        Lo, Hi = max(a, X[i] - Step), min(b, X[i] + Step)
+        Best = Sign * Y[i]
+        if Hi > Lo:
+            Res = minimize_scalar(lambda x: Sign * float(f(x)), bounds=(Lo, Hi), method='bounded')
+            Best = min(Best, Res.fun)
+        Extremes.append(Sign * Best)
+    return Extremes[0], Extremes[1]
+
+
+def mc_integrate_adaptive(f, bounds, abs_tol=0.0, rel_tol=1e-3, confidence=0.95,
+                          batch_size=2**16, min_batches=4, max_samples=10**9,
+                          workers=1, seed=None, keep=0):
+    """Sample-mean integral that keeps drawing batches until the CI half-width meets the target.
+
+    Stops once z * std_error <= max(abs_tol, rel_tol * |estimate|), using the
+    running Welford variance of the integrand values.
+    """
+    if abs_tol <= 0 and rel_tol <= 0:
+        raise ValueError("at least one of abs_tol and rel_tol must be positive")
+    Bounds = np.atleast_2d(np.asarray(bounds, dtype=np.float64))
+    Low, High = Bounds[:, 0], Bounds[:, 1]
+    Volume = np.prod(High - Low)
+    Z = norm.ppf(0.5 + confidence / 2)
+    Root = np.random.SeedSequence(seed)
+    MergeGen = np.random.Generator(np.random.Philox(Root.spawn(1)[0]))
+    Moments = RunningMoments()
+    Reservoir = (0, None)
+    Pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        Batches = 0
+        while Moments.n < max_samples:
+            Round = max(1, min(workers, (max_samples - Moments.n) // batch_size))
+            Tasks = [(f, Low, High, min(batch_size, max_samples - Moments.n), ss, keep, 0, None)
+                     for ss in Root.spawn(Round)]
+            Results = Pool.map(_integrate_chunk, Tasks) if Pool else map(_integrate_chunk, Tasks)
+            for Size, Mean, M2, Sample in Results:
+                Moments.add_batch(Size, Mean, M2)
+                if keep:
+                    Reservoir = merge_reservoirs(MergeGen, Reservoir, (Size, Sample), keep)
+            Batches += Round
+            HalfWidth = Z * Volume * Moments.std_error
+            Target = max(abs_tol, rel_tol * abs(Volume * Moments.mean))
+            if Batches >= min_batches and HalfWidth <= Target:
+                break
+    finally:
+        if Pool:
+            Pool.shutdown()
+    Estimate = Volume * Moments.mean
+    StdError = Volume * Moments.std_error
+    return MCResult(Estimate, StdError, (Estimate - Z * StdError, Estimate + Z * StdError),
+                    Moments.n, Reservoir[1])
+
+
+def quarter_circle(x):
+    return 4.0 * (x[0]**2 + x[1]**2 <= 1)
+
+
+def square(x):
+    return x**2
+
+
+if __name__ == '__main__':
+    import matplotlib.pyplot as plt
+
+    Workers = os.cpu_count() or 1
+
+    PiResult = mc_integrate(quarter_circle, [(0, 1), (0, 1)], 10**7, workers=Workers,
+                            seed=1, keep=2000)
+    print("Pi = %.6f +/- %.6f, 95%% CI = (%.6f, %.6f)" %
+          (PiResult.estimate, PiResult.std_error, *PiResult.conf_int))
+
+    IntResult = mc_integrate(square, [(0, 3)], 10**7, workers=Workers, seed=2)
+    print("Numerical integration = %.6f +/- %.6f" % (IntResult.estimate, IntResult.std_error))
+
+    YMin, YMax = function_range(square, 0.0, 3.0)
+    print("Bounding box of f on [0, 3]: ymin = %.6f, ymax = %.6f" % (YMin, YMax))
+    Adaptive = mc_integrate_adaptive(square, [(0, 3)], rel_tol=1e-3, seed=2)
+    print("Adaptive integration = %.6f +/- %.6f after %d samples" %
+          (Adaptive.estimate, Adaptive.std_error, Adaptive.n))
+
+    XSample, YSample = PiResult.sample
+    Inside = YSample > 0
+    XLin = np.linspace(0, 1)
+    plt.axis("equal")
+    plt.grid(which="major")
+    plt.plot(XLin, np.sqrt(1 - XLin**2), color="red", linewidth="4")
+    plt.scatter(XSample[0, Inside], XSample[1, Inside], color="yellow", marker=".")
+    plt.scatter(XSample[0, ~Inside], XSample[1, ~Inside], color="blue", marker=".")
+    plt.title("Monte Carlo method for Pi estimation")
+    plt.show()
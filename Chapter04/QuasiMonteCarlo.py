@@ -0,0 +1,156 @@
+import warnings
+
+import numpy as np
+from scipy.stats import norm, qmc, t
+
+from MonteCarloEngine import MCResult, mc_integrate
+
+Engines = {'sobol': qmc.Sobol, 'halton': qmc.Halton}
+
+
+class QMCSource:
+    """Scrambled low-discrepancy points with the Generator.random((d, n)) interface.
+
+    The dimension is fixed by the first call. skip fast-forwards past the first
+    points, so chunk j of a run can start exactly where chunk j-1 stopped.
+    shift, if given, seeds a uniform random shift added to every point mod 1
+    (Cranley-Patterson rotation) on top of the scrambling.
+    """
+
+    def __init__(self, kind='sobol', seed=None, skip=0, scramble=True, shift=None):
+        if kind not in Engines:
+            raise ValueError("kind must be one of %s" % sorted(Engines))
+        self.kind = kind
+        self.seed = seed
+        self.skip = skip
+        self.scramble = scramble
+        self.shift = shift
+        self.offset = None
+        self.engine = None
+
+    def _start(self, d):
+        self.engine = Engines[self.kind](d, scramble=self.scramble, rng=self.seed)
+        if self.shift is not None:
+            self.offset = np.random.default_rng(self.shift).random(d)
+        if self.skip:
+            self.engine.fast_forward(self.skip)
+
+    def fast_forward(self, k):
+        if self.engine is None:
+            self.skip += k
+        else:
+            self.engine.fast_forward(k)
+        return self
+
+    def random(self, size):
+        d, n = size
+        if self.engine is None:
+            self._start(d)
+        elif self.engine.d != d:
+            raise ValueError("source was started with dimension %d" % self.engine.d)
+        U = self.engine.random(n)
+        if self.offset is not None:
+            U += self.offset
+            U %= 1.0
+        return U.T
+
+    def standard_normal(self, size):
+        U = self.random(size)
+        return norm.ppf(np.clip(U, 1e-16, 1 - 1e-16))
+
+
+class QMCStreams:
+    """Picklable source factory for mc_integrate: every chunk shares one scrambling and shift."""
+
+    def __init__(self, kind='sobol', seed=None, shift=None):
+        self.kind = kind
+        self.seed = seed
+        self.shift = shift
+
+    def __call__(self, Seed, Offset):
+        return QMCSource(self.kind, self.seed, skip=Offset, shift=self.shift)
+
+
+def rqmc_integrate(f, bounds, n, replicates=16, kind='sobol', seed=None, chunk_size=2**20,
+                   workers=1, confidence=0.95):
+    # independent scramblings and random shifts give i.i.d. replicate estimates; the shift
+    # matters in one dimension, where every scrambling of 2**m Sobol' points is the same set
+    Children = np.random.SeedSequence(seed).spawn(replicates)
+    Estimates = np.array([
+        mc_integrate(f, bounds, n, chunk_size=chunk_size, workers=workers,
+                     source=QMCStreams(kind, *(int(s) for s in c.generate_state(2)))).estimate
+        for c in Children])
+    Estimate = Estimates.mean()
+    StdError = Estimates.std(ddof=1) / np.sqrt(replicates)
+    if StdError == 0:
+        warnings.warn("all %d replicates agree exactly, so the standard error of 0 does not "
+                      "bound the integration error" % replicates, RuntimeWarning)
+    Q = t.ppf(0.5 + confidence / 2, replicates - 1)
+    return MCResult(Estimate, StdError, (Estimate - Q * StdError, Estimate + Q * StdError),
+                    n * replicates, None)
+
+
+def bridge_schedule(steps):
+    # construction order for points 1..steps: endpoint first, then recursive midpoints
+    Order = [(steps, 0, 0)]
+    Intervals = [(0, steps)]
+    while Intervals:
+        Next = []
+        for l, r in Intervals:
+            if r - l > 1:
+                m = (l + r) // 2
+                Order.append((m, l, r))
+                Next += [(l, m), (m, r)]
+        Intervals = Next
+    return Order
+
+
+def brownian_bridge(Z, dt=1.0):
+    """Standard Brownian motion at times dt, 2*dt, ... from normals Z (steps x paths).
+
+    Row 0 of Z sets the terminal value and later rows fill in ever finer detail,
+    which puts the leading low-discrepancy coordinates where they matter most.
+    """
+    Z = np.asarray(Z)
+    steps = Z.shape[0]
+    W = np.zeros((steps + 1,) + Z.shape[1:])
+    for k, (m, l, r) in enumerate(bridge_schedule(steps)):
+        if k == 0:
+            W[m] = np.sqrt(steps * dt) * Z[0]
+            continue
+        tl, tm, tr = l * dt, m * dt, r * dt
+        W[m] = ((tr - tm) * W[l] + (tm - tl) * W[r]) / (tr - tl) \
+            + np.sqrt((tm - tl) * (tr - tm) / (tr - tl)) * Z[k]
+    return W[1:]
+
+
+def gbm_paths(S0, drift, sigma, steps, paths, source=None, bridge=True):
+    # S_t = S0 * exp(drift * t + sigma * W_t) with unit time steps, as in Chapter08
+    if source is None:
+        source = QMCSource('sobol')
+    Z = source.standard_normal((steps, paths))
+    W = brownian_bridge(Z) if bridge else np.cumsum(Z, axis=0)
+    Times = np.arange(1, steps + 1)[:, None]
+    return S0 * np.exp(drift * Times + sigma * W)
+
+
+if __name__ == '__main__':
+    from MonteCarloEngine import quarter_circle, square
+
+    # in one dimension every scrambling of 2**m Sobol' points gives the same set, so
+    # the replicates differ only through their random shifts
+    N = 2**14
+    for Name, f, Bounds in (("x**2", square, [(0, 3)]), ("Pi", quarter_circle, [(0, 1), (0, 1)])):
+        Crude = [mc_integrate(f, Bounds, N, seed=s).estimate for s in range(16)]
+        print("%s crude MC:    estimate = %.8f  std error = %.2e" %
+              (Name, np.mean(Crude), np.std(Crude, ddof=1) / 4))
+        for Kind in ('sobol', 'halton'):
+            Result = rqmc_integrate(f, Bounds, N, kind=Kind, seed=1)
+            print("%s RQMC %-6s estimate = %.8f  std error = %.2e  CI [%.8f, %.8f]" %
+                  ((Name, Kind, Result.estimate, Result.std_error) + tuple(Result.conf_int)))
+
+    S0, Drift, Sigma, Steps, Paths = 100.0, 0.0005, 0.02, 256, 2**12
+    Exact = S0 * np.exp((Drift + 0.5 * Sigma**2) * Steps)
+    for Seed in range(3):
+        Prices = gbm_paths(S0, Drift, Sigma, Steps, Paths, QMCSource('sobol', seed=Seed))
+        print("Bridge Sobol mean terminal price = %.4f (exact %.4f)" % (Prices[-1].mean(), Exact))
@@ -0,0 +1,194 @@
+from collections import namedtuple
+
+import numpy as np
+from scipy.stats import norm
+
+from MonteCarloEngine import evaluate
+
+VRResult = namedtuple('VRResult', ['estimate', 'std_error', 'conf_int', 'n', 'reduction_factor'])
+
+
+# Sample generators: these return plain arrays so other engines (e.g. the
+# Chapter08 GBM shocks) can use them as their source of draws.
+
+def antithetic_uniforms(Gen, d, n):
+    Half = Gen.random((d, (n + 1) // 2))
+    return np.concatenate((Half, 1.0 - Half), axis=1)[:, :n]
+
+
+def antithetic_normals(Gen, shape):
+    # pairs along the last axis: Z[..., :k] and -Z[..., :k]
+    Shape = tuple(np.atleast_1d(shape))
+    Half = Gen.standard_normal(Shape[:-1] + ((Shape[-1] + 1) // 2,))
+    return np.concatenate((Half, -Half), axis=-1)[..., :Shape[-1]]
+
+
+def latin_hypercube(Gen, d, n):
+    # one point in each of the n equal slices of every coordinate
+    Perms = np.argsort(Gen.random((d, n)), axis=1)
+    return (Perms + Gen.random((d, n))) / n
+
+
+def stratified_uniforms(Gen, d, per_dim, per_stratum):
+    # equal-allocation grid strata; returns points and their stratum index
+    K = per_dim**d
+    Cells = np.indices((per_dim,) * d).reshape(d, K)
+    Cells = np.repeat(Cells, per_stratum, axis=1)
+    Points = (Cells + Gen.random(Cells.shape)) / per_dim
+    return Points, np.repeat(np.arange(K), per_stratum)
+
+
+def control_variate_estimate(Y, C, c_mean):
+    # Y - b*(C - E[C]) with the estimated optimal b = cov(Y, C) / var(C)
+    Y = np.asarray(Y, dtype=np.float64)
+    C = np.asarray(C, dtype=np.float64)
+    Cov = np.cov(Y, C)
+    b = Cov[0, 1] / Cov[1, 1]
+    Adjusted = Y - b * (C - c_mean)
+    return Adjusted.mean(), Adjusted.std(ddof=1) / np.sqrt(Y.size), b
+
+
+# Integrators over a box, each reporting the variance-reduction factor, i.e. the
+# crude Monte Carlo variance divided by the method's variance for the same
+# number of integrand evaluations.
+
+def _box(bounds):
+    Bounds = np.atleast_2d(np.asarray(bounds, dtype=np.float64))
+    return Bounds[:, 0], Bounds[:, 1]
+
+
+def _scale(Low, High, U):
+    return Low[:, None] + (High - Low)[:, None] * U
+
+
+def _crude_variance(f, Low, High, Gen, pilot):
+    Y = evaluate(f, _scale(Low, High, Gen.random((Low.size, pilot))))
+    return np.prod(High - Low)**2 * Y.var(ddof=1)
+
+
+def _result(Estimate, StdError, n, CrudeVar, confidence):
+    Z = norm.ppf(0.5 + confidence / 2)
+    Factor = CrudeVar / (StdError**2 * n) if StdError > 0 else np.inf
+    return VRResult(Estimate, StdError, (Estimate - Z * StdError, Estimate + Z * StdError),
+                    n, Factor)
+
+
+def crude_integrate(f, bounds, n, seed=None, confidence=0.95):
+    Low, High = _box(bounds)
+    Gen = np.random.default_rng(seed)
+    Y = np.prod(High - Low) * evaluate(f, _scale(Low, High, Gen.random((Low.size, n))))
+    return _result(Y.mean(), Y.std(ddof=1) / np.sqrt(n), n, Y.var(ddof=1), confidence)
+
+
+def antithetic_integrate(f, bounds, n, seed=None, confidence=0.95):
+    Low, High = _box(bounds)
+    Gen = np.random.default_rng(seed)
+    Pairs = n // 2
+    U = antithetic_uniforms(Gen, Low.size, 2 * Pairs)
+    Y = np.prod(High - Low) * evaluate(f, _scale(Low, High, U))
+    PairMean = 0.5 * (Y[:Pairs] + Y[Pairs:])
+    return _result(PairMean.mean(), PairMean.std(ddof=1) / np.sqrt(Pairs), 2 * Pairs,
+                   Y.var(ddof=1), confidence)
+
+
+def control_variate_integrate(f, g, g_integral, bounds, n, seed=None, confidence=0.95):
+    Low, High = _box(bounds)
+    Gen = np.random.default_rng(seed)
+    Volume = np.prod(High - Low)
+    X = _scale(Low, High, Gen.random((Low.size, n)))
+    Y = Volume * evaluate(f, X)
+    C = Volume * evaluate(g, X)
+    Estimate, StdError, b = control_variate_estimate(Y, C, g_integral)
+    return _result(Estimate, StdError, n, Y.var(ddof=1), confidence)
+
+
+def stratified_integrate(f, bounds, n, per_dim=None, seed=None, confidence=0.95, pilot=10000):
+    Low, High = _box(bounds)
+    d = Low.size
+    Gen = np.random.default_rng(seed)
+    if per_dim is None:
+        per_dim = max(1, int((n / 2)**(1.0 / d)))
+    K = per_dim**d
+    PerStratum = max(2, n // K)
+    U, _ = stratified_uniforms(Gen, d, per_dim, PerStratum)
+    Y = np.prod(High - Low) * evaluate(f, _scale(Low, High, U))
+    Y = Y.reshape(K, PerStratum)
+    Estimate = Y.mean(axis=1).mean()
+    StdError = np.sqrt((Y.var(axis=1, ddof=1) / PerStratum).sum()) / K
+    return _result(Estimate, StdError, K * PerStratum,
+                   _crude_variance(f, Low, High, Gen, pilot), confidence)
+
+
+def latin_hypercube_integrate(f, bounds, n, replicates=20, seed=None, confidence=0.95,
+                              pilot=10000):
+    # LHS has no closed-form error, so the spread of independent replicates is used
+    Low, High = _box(bounds)
+    Gen = np.random.default_rng(seed)
+    PerRep = n // replicates
+    Volume = np.prod(High - Low)
+    Means = np.empty(replicates)
+    for r in range(replicates):
+        U = latin_hypercube(Gen, Low.size, PerRep)
+        Means[r] = Volume * evaluate(f, _scale(Low, High, U)).mean()
+    StdError = Means.std(ddof=1) / np.sqrt(replicates)
+    return _result(Means.mean(), StdError, PerRep * replicates,
+                   _crude_variance(f, Low, High, Gen, pilot), confidence)
+
+
+def importance_integrate(f, sample_q, pdf_q, bounds, n, seed=None, confidence=0.95, pilot=10000):
+    """Integral of f over the box as E_q[f(X)/q(X)] with X drawn from the proposal q.
+
+    sample_q(Gen, n) returns points shaped like the integrand's input and
+    pdf_q(x) their density; draws outside the box contribute zero.
+    """
+    Low, High = _box(bounds)
+    Gen = np.random.default_rng(seed)
+    X = np.atleast_2d(sample_q(Gen, n))
+    Inside = np.all((X >= Low[:, None]) & (X <= High[:, None]), axis=0)
+    Density = np.asarray(pdf_q(X[0] if X.shape[0] == 1 else X), dtype=np.float64)
+    W = np.zeros(n)
+    W[Inside] = evaluate(f, X)[Inside] / Density[Inside]
+    return _result(W.mean(), W.std(ddof=1) / np.sqrt(n), n,
+                   _crude_variance(f, Low, High, Gen, pilot), confidence)
+
+
+def linear(x):
+    return x
+
+
+def report(Name, Result):
+    print("%-18s estimate = %.6f  std error = %.2e  reduction factor = %8.2f" %
+          (Name, Result.estimate, Result.std_error, Result.reduction_factor))
+
+
+if __name__ == '__main__':
+    from MonteCarloEngine import quarter_circle, square
+
+    N = 10**5
+    print("Integral of x**2 on [0, 3] (exact value 9)")
+    report("crude", crude_integrate(square, [(0, 3)], N, seed=1))
+    report("antithetic", antithetic_integrate(square, [(0, 3)], N, seed=1))
+    report("control variate", control_variate_integrate(square, linear, 4.5, [(0, 3)], N, seed=1))
+    report("stratified", stratified_integrate(square, [(0, 3)], N, seed=1))
+    report("latin hypercube", latin_hypercube_integrate(square, [(0, 3)], N, seed=1))
+    report("importance", importance_integrate(
+        square, lambda Gen, n: 3.0 * np.sqrt(Gen.random(n)), lambda x: 2.0 * x / 9.0,
+        [(0, 3)], N, seed=1))
+
+    print("Pi")
+    report("crude", crude_integrate(quarter_circle, [(0, 1), (0, 1)], N, seed=2))
+    report("antithetic", antithetic_integrate(quarter_circle, [(0, 1), (0, 1)], N, seed=2))
+    report("stratified", stratified_integrate(quarter_circle, [(0, 1), (0, 1)], N, seed=2))
+    report("latin hypercube", latin_hypercube_integrate(quarter_circle, [(0, 1), (0, 1)], N, seed=2))
+
+    # GBM terminal price: antithetic shocks and the exactly known E[S_T] as control
+    S0, Mu, Sigma, T = 100.0, 0.05, 0.2, 1.0
+    Gen = np.random.default_rng(3)
+    Z = antithetic_normals(Gen, N)
+    ST = S0 * np.exp((Mu - 0.5 * Sigma**2) * T + Sigma * np.sqrt(T) * Z)
+    Payoff = np.maximum(ST - 100.0, 0.0)
+    Estimate, StdError, b = control_variate_estimate(Payoff, ST, S0 * np.exp(Mu * T))
+    Crude = S0 * np.exp((Mu - 0.5 * Sigma**2) * T + Sigma * np.sqrt(T) * Gen.standard_normal(N))
+    Crude = np.maximum(Crude - 100.0, 0.0)
+    print("GBM call payoff = %.4f +/- %.4f (crude %.4f +/- %.4f)" %
+          (Estimate, StdError, Crude.mean(), Crude.std(ddof=1) / np.sqrt(N)))
@@ -0,0 +1,161 @@
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.csgraph import connected_components
+from scipy.sparse.linalg import spsolve
+
+
+class MarkovChain:
+    """Discrete-time Markov chain on states 0..S-1 with a dense or scipy.sparse transition matrix."""
+
+    def __init__(self, P, states=None, tol=1e-10):
+        self.sparse = sp.issparse(P)
+        self.P = sp.csr_matrix(P, dtype=np.float64) if self.sparse else np.asarray(P, dtype=np.float64)
+        S = self.P.shape[0]
+        if self.P.shape != (S, S):
+            raise ValueError("transition matrix must be square")
+        RowSums = np.asarray(self.P.sum(axis=1)).ravel()
+        if np.any(np.abs(RowSums - 1) > tol) or (self.P.min() < 0):
+            raise ValueError("transition matrix rows must be probability distributions")
+        self.n_states = S
+        self.states = list(states) if states is not None else list(range(S))
+        self._build_lookup()
+
+    def _build_lookup(self):
+        # cumulative probabilities within each row; step() searches only between the row's bounds
+        C = sp.csr_matrix(self.P)
+        C.eliminate_zeros()
+        Length = np.diff(C.indptr)
+        Order = np.argsort(-Length, kind='stable')
+        Longest = -Length[Order]
+        Cum = C.data.copy()
+        for k in range(1, int(Length.max())):
+            Entry = C.indptr[Order[:np.searchsorted(Longest, -k)]] + k
+            Cum[Entry] += Cum[Entry - 1]
+        Cum[C.indptr[1:] - 1] = 1.0
+        self._indptr = C.indptr.astype(np.int64)
+        self._cum = Cum
+        self._next = C.indices.astype(np.int64)
+        self._depth = int(Length.max() - 1).bit_length()
+
+    def step(self, State, Gen):
+        U = Gen.random(State.size)
+        # vectorized binary search for the first entry of each row with Cum > U
+        Lo = self._indptr[State]
+        Hi = self._indptr[State + 1] - 1
+        for _ in range(self._depth):
+            Mid = (Lo + Hi) >> 1
+            Right = self._cum[Mid] <= U
+            Lo = np.where(Right, Mid + 1, Lo)
+            Hi = np.where(Right, Hi, Mid)
+        return self._next[Lo]
+
+    def simulate(self, n_chains, steps, start=0, seed=None, record=True):
+        """Run n_chains independent chains for the given number of steps.
+
+        start is a state index, an array of per-chain start states, or a
+        probability vector (length S, float) to draw them from. Returns the
+        (steps + 1, n_chains) state history, or only the final states if
+        record is False.
+        """
+        Gen = np.random.default_rng(seed)
+        Start = np.asarray(start)
+        if Start.dtype.kind == 'f' and Start.shape == (self.n_states,):
+            State = Gen.choice(self.n_states, size=n_chains, p=Start)
+        else:
+            State = np.broadcast_to(Start, (n_chains,)).astype(np.int64)
+        Dtype = np.min_scalar_type(self.n_states - 1)
+        History = np.empty((steps + 1, n_chains), dtype=Dtype) if record else None
+        if record:
+            History[0] = State
+        for t in range(1, steps + 1):
+            State = self.step(State, Gen)
+            if record:
+                History[t] = State
+        return History if record else State
+
+    def stationary(self):
+        # solve pi (P - I) = 0 together with sum(pi) = 1
+        S = self.n_states
+        if self.sparse:
+            # pin pi = 1 at a state of a closed class, which is recurrent, and solve for the rest;
+            # a normalisation row of ones, as below, would fill in the sparse LU
+            C = self.P.tocoo()
+            n, Label = connected_components(self.P, directed=True, connection='strong')
+            Leaving = (Label[C.row] != Label[C.col]) & (C.data != 0)
+            Open = np.zeros(n, dtype=bool)
+            Open[Label[C.row[Leaving]]] = True
+            r = int(np.flatnonzero(~Open[Label])[0])
+            Keep = np.arange(S) != r
+            A = (self.P.T - sp.identity(S, format='csr')).tocsr()[Keep]
+            Pi = np.ones(S)
+            Pi[Keep] = spsolve(A[:, Keep].tocsc(), -A[:, r].toarray().ravel())
+            return Pi / Pi.sum()
+        b = np.zeros(S)
+        b[-1] = 1.0
+        A = self.P.T - np.eye(S)
+        A[-1] = 1.0
+        return np.linalg.solve(A, b)
+
+    def n_step_matrix(self, n):
+        # repeated squaring: O(log n) matrix products
+        Result = sp.identity(self.n_states, format='csr') if self.sparse else np.eye(self.n_states)
+        Base = self.P
+        while n > 0:
+            if n & 1:
+                Result = Result @ Base
+            Base = Base @ Base
+            n >>= 1
+        return Result
+
+    def distribution(self, p0, n):
+        p0 = np.asarray(p0, dtype=np.float64)
+        return np.asarray(self.n_step_matrix(n).T @ p0).ravel()
+
+    def hitting_times(self, targets):
+        """Expected number of steps to first reach any of the target states, from every state."""
+        Targets = np.zeros(self.n_states, dtype=bool)
+        Targets[np.asarray(targets)] = True
+        Others = np.flatnonzero(~Targets)
+        H = np.zeros(self.n_states)
+        if Others.size == 0:
+            return H
+        if self.sparse:
+            Q = self.P[Others][:, Others]
+            A = sp.identity(Others.size, format='csc') - Q.tocsc()
+            H[Others] = spsolve(A, np.ones(Others.size))
+        else:
+            Q = self.P[np.ix_(Others, Others)]
+            H[Others] = np.linalg.solve(np.eye(Others.size) - Q, np.ones(Others.size))
+        return H
+
+
+if __name__ == '__main__':
+    import matplotlib.pyplot as plt
+
+    StatesData = ["Sunny", "Rainy"]
+    TransitionMatrix = [[0.80, 0.20], [0.25, 0.75]]
+    Weather = MarkovChain(TransitionMatrix, StatesData)
+
+    NumDays = 365
+    History = Weather.simulate(10000, NumDays - 1, start=0, seed=3)
+    print("Simulated share of sunny days =", np.mean(History == 0))
+    print("Stationary distribution =", Weather.stationary())
+    print("Distribution after 7 days from Sunny =", Weather.distribution([1, 0], 7))
+    print("Expected days until rain from each state =", Weather.hitting_times([1]))
+
+    # a sparse birth-death chain with 10^5 states
+    S = 10**5
+    Up = np.full(S - 1, 0.45)
+    Down = np.full(S - 1, 0.55)
+    Stay = np.zeros(S)
+    Stay[0] = 0.55
+    Stay[-1] = 0.45
+    P = sp.diags([Down, Stay, Up], [-1, 0, 1], format='csr')
+    Chain = MarkovChain(P)
+    Pi = Chain.stationary()
+    print("Birth-death chain: P(state 0) = %.4f, mean state = %.4f" % (Pi[0], Pi @ np.arange(S)))
+    Final = Chain.simulate(100000, 1000, start=0, seed=1, record=False)
+    print("Simulated mean state after 1000 steps = %.4f" % Final.mean())
+
+    plt.plot([StatesData[s] for s in History[:, 0]])
+    plt.show()
@@ -0,0 +1,106 @@
+from collections import namedtuple
+
+import numpy as np
+
+WalkStatistics = namedtuple('WalkStatistics', ['walkers', 'steps', 'level', 'positions',
+                                               'final_counts', 'max_counts', 'min_counts',
+                                               'hit_counts'])
+
+
+def path_dtype(steps):
+    for Type in (np.int8, np.int16, np.int32, np.int64):
+        if steps <= np.iinfo(Type).max:
+            return Type
+
+
+def simulate_walks(walkers, steps, level=None, walker_chunk=10000, step_chunk=1000,
+                   seed=None, out_path=None):
+    """Simulate walkers independent +/-1 random walks of the given length.
+
+    Walkers are processed in blocks of walker_chunk rows and steps in blocks of
+    step_chunk columns, integrated with cumsum from the carried position, so
+    memory is bounded by one block whatever the totals. Statistics are
+    accumulated as histograms: final position and running max/min indexed by
+    value + steps, and first-passage times to level (index 0 unused). If
+    out_path is given, every path is written to a memory-mapped .npy file.
+    """
+    Paths = None
+    if out_path is not None:
+        Paths = np.lib.format.open_memmap(out_path, mode='w+', dtype=path_dtype(steps),
+                                          shape=(walkers, steps))
+    Width = 2 * steps + 1
+    FinalCounts = np.zeros(Width, dtype=np.int64)
+    MaxCounts = np.zeros(Width, dtype=np.int64)
+    MinCounts = np.zeros(Width, dtype=np.int64)
+    HitCounts = np.zeros(steps + 1, dtype=np.int64)
+
+    Seeds = np.random.SeedSequence(seed).spawn(-(-walkers // walker_chunk))
+    for Block, Seed in zip(range(0, walkers, walker_chunk), Seeds):
+        Gen = np.random.default_rng(Seed)
+        w = min(walker_chunk, walkers - Block)
+        Position = np.zeros(w, dtype=np.int64)
+        RunMax = np.zeros(w, dtype=np.int64)
+        RunMin = np.zeros(w, dtype=np.int64)
+        HitTime = np.zeros(w, dtype=np.int64)
+        for Start in range(0, steps, step_chunk):
+            s = min(step_chunk, steps - Start)
+            Z = 2 * Gen.integers(0, 2, size=(w, s), dtype=np.int8) - 1
+            P = np.cumsum(Z, axis=1, dtype=np.int64)
+            P += Position[:, None]
+            np.maximum(RunMax, P.max(axis=1), out=RunMax)
+            np.minimum(RunMin, P.min(axis=1), out=RunMin)
+            if level is not None:
+                Open = HitTime == 0
+                Hit = (P[Open] >= level) if level > 0 else (P[Open] <= level)
+                First = Hit.argmax(axis=1)
+                Reached = Hit[np.arange(First.size), First]
+                Rows = np.flatnonzero(Open)[Reached]
+                HitTime[Rows] = Start + First[Reached] + 1
+            if Paths is not None:
+                Paths[Block:Block + w, Start:Start + s] = P
+            Position = P[:, -1]
+        FinalCounts += np.bincount(Position + steps, minlength=Width)
+        MaxCounts += np.bincount(RunMax + steps, minlength=Width)
+        MinCounts += np.bincount(RunMin + steps, minlength=Width)
+        HitCounts += np.bincount(HitTime, minlength=steps + 1)
+    if Paths is not None:
+        Paths.flush()
+    HitCounts[0] = 0
+    return WalkStatistics(walkers, steps, level, np.arange(-steps, steps + 1), FinalCounts,
+                          MaxCounts, MinCounts, HitCounts)
+
+
+def histogram_mean(Values, Counts):
+    return (Values * Counts).sum() / Counts.sum()
+
+
+def histogram_quantile(Values, Counts, q):
+    return Values[np.searchsorted(np.cumsum(Counts), q * Counts.sum())]
+
+
+if __name__ == '__main__':
+    import os
+    import tempfile
+    from matplotlib import pyplot
+
+    Walkers, Steps, Level = 10**5, 1000, 30
+    PathFile = os.path.join(tempfile.gettempdir(), 'random_walks.npy')
+    Stats = simulate_walks(Walkers, Steps, level=Level, seed=1, out_path=PathFile)
+
+    Positions = Stats.positions
+    print("Mean final position = ", histogram_mean(Positions, Stats.final_counts))
+    print("Final position variance = ",
+          histogram_mean(Positions**2, Stats.final_counts)
+          - histogram_mean(Positions, Stats.final_counts)**2)
+    print("Mean maximum excursion = ", histogram_mean(Positions, Stats.max_counts))
+    print("Median maximum excursion = ", histogram_quantile(Positions, Stats.max_counts, 0.5))
+    HitFraction = Stats.hit_counts.sum() / Walkers
+    print("Fraction reaching", Level, "within", Steps, "steps = ", HitFraction)
+
+    Paths = np.load(PathFile, mmap_mode='r')
+    pyplot.plot(Paths[0])
+    pyplot.show()
+
+    pyplot.figure()
+    pyplot.bar(Positions, Stats.final_counts)
+    pyplot.show()
@@ -0,0 +1,98 @@
+import os
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from scipy.stats import norm
+
+from JackknifeEngine import _resolve, grouped_values, leave_one_out
+
+BootstrapResult = namedtuple('BootstrapResult', ['estimate', 'std_error', 'bias', 'replicates',
+                                                 'intervals'])
+
+
+def _bootstrap_chunk(Task):
+    Data, statistic, size, Seed, max_elements = Task
+    Stat = _resolve(statistic)
+    Gen = np.random.default_rng(Seed)
+    n = Data.size
+    Rows = max(1, max_elements // n)
+    Out = np.empty(size)
+    for Start in range(0, size, Rows):
+        b = min(Rows, size - Start)
+        Idx = Gen.integers(0, n, size=(b, n), dtype=np.min_scalar_type(n))
+        Out[Start:Start + b] = Stat(Data[Idx], axis=-1)
+    return Out
+
+
+def jackknife_values(Data, statistic, max_groups=2000):
+    """Leave-one-out values of the statistic, grouped into max_groups blocks for large n."""
+    if isinstance(statistic, str) or Data.size <= max_groups:
+        return leave_one_out(Data, statistic)
+    return grouped_values(Data, statistic, max_groups)
+
+
+def confidence_intervals(Estimate, Replicates, JackValues, confidence=0.95):
+    Alpha = (1 - confidence) / 2
+    Lo, Hi = np.quantile(Replicates, [Alpha, 1 - Alpha])
+    Intervals = {'percentile': (Lo, Hi), 'basic': (2 * Estimate - Hi, 2 * Estimate - Lo)}
+    Below = np.mean(Replicates < Estimate) + 0.5 * np.mean(Replicates == Estimate)
+    Z0 = norm.ppf(np.clip(Below, 1e-12, 1 - 1e-12))
+    Diff = JackValues.mean() - JackValues
+    Den = 6.0 * (Diff**2).sum()**1.5
+    A = (Diff**3).sum() / Den if Den > 0 else 0.0
+    Z = norm.ppf([Alpha, 1 - Alpha])
+    Adjusted = norm.cdf(Z0 + (Z0 + Z) / (1 - A * (Z0 + Z)))
+    Intervals['bca'] = tuple(np.quantile(Replicates, Adjusted))
+    return Intervals
+
+
+def bootstrap(data, statistic='mean', replicates=10000, workers=1, seed=None,
+              confidence=0.95, chunk_replicates=1000, max_elements=2**24):
+    """Nonparametric bootstrap of a 1-D sample.
+
+    statistic is 'mean', 'var', 'std', 'cv' or a function stat(X, axis=-1) reducing the
+    last axis of a resample matrix. Resamples are drawn as integer index
+    matrices in the smallest dtype that holds n, max_elements values at a
+    time, and with workers > 1 each block of chunk_replicates replicates runs
+    in its own process.
+    """
+    Data = np.asarray(data, dtype=np.float64).ravel()
+    Estimate = float(_resolve(statistic)(Data, axis=-1))
+
+    Sizes = [chunk_replicates] * (replicates // chunk_replicates)
+    if replicates % chunk_replicates:
+        Sizes.append(replicates % chunk_replicates)
+    Seeds = np.random.SeedSequence(seed).spawn(len(Sizes))
+    Tasks = [(Data, statistic, s, ss, max_elements) for s, ss in zip(Sizes, Seeds)]
+    if workers == 1:
+        Reps = np.concatenate(list(map(_bootstrap_chunk, Tasks)))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as Pool:
+            Reps = np.concatenate(list(Pool.map(_bootstrap_chunk, Tasks)))
+
+    Intervals = confidence_intervals(Estimate, Reps, jackknife_values(Data, statistic), confidence)
+    return BootstrapResult(Estimate, Reps.std(ddof=1), Reps.mean() - Estimate, Reps, Intervals)
+
+
+if __name__ == '__main__':
+    import time
+    import matplotlib.pyplot as plt
+
+    Gen = np.random.default_rng(7)
+    PopData = 50 * Gen.random(1000)
+
+    Result = bootstrap(PopData, 'mean', replicates=10000, seed=7)
+    print("The mean of the Bootstrap estimator is ", Result.replicates.mean())
+    print("The mean of the population is ", Result.estimate)
+    for Name, (Lo, Hi) in Result.intervals.items():
+        print("%-10s 95%% CI = (%.4f, %.4f)" % (Name, Lo, Hi))
+
+    plt.hist(Result.replicates)
+    plt.show()
+
+    BigData = Gen.lognormal(size=10**6)
+    Start = time.perf_counter()
+    Result = bootstrap(BigData, 'std', replicates=1000, workers=os.cpu_count() or 1, seed=1)
+    print("10^6 rows x 1000 replicates in %.1f s, BCa 95%% CI for std = (%.4f, %.4f)" %
+          (time.perf_counter() - Start, *Result.intervals['bca']))
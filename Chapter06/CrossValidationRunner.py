@@ -0,0 +1,217 @@
+import hashlib
+import os
+import pickle
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+from sklearn.base import clone
+from sklearn.metrics import get_scorer
+from sklearn.model_selection import KFold, ParameterGrid
+
+
+class SharedArray:
+    """Picklable handle to an array held in shared memory or in a .npy memmap.
+
+    Workers call attach() and get a view on the same pages instead of a copy.
+    """
+
+    def __init__(self, array, storage='shm', path=None):
+        Array = np.ascontiguousarray(array)
+        self.shape = Array.shape
+        self.dtype = Array.dtype.str
+        self.storage = storage
+        self._shm = None
+        if storage == 'shm':
+            self._shm = shared_memory.SharedMemory(create=True, size=max(1, Array.nbytes))
+            self.name = self._shm.name
+            np.ndarray(self.shape, dtype=self.dtype, buffer=self._shm.buf)[...] = Array
+        elif storage == 'memmap':
+            if path is None:
+                raise ValueError("memmap storage needs a path")
+            np.save(path, Array)
+            self.name = path
+        else:
+            raise ValueError("storage must be 'shm' or 'memmap'")
+
+    def __getstate__(self):
+        State = self.__dict__.copy()
+        State['_shm'] = None
+        return State
+
+    def attach(self):
+        # one mapping per worker process, reused by every task it runs
+        if self.name not in _Attached:
+            if self.storage == 'memmap':
+                _Attached[self.name] = np.load(self.name, mmap_mode='r')
+            else:
+                Shm = shared_memory.SharedMemory(name=self.name)
+                _Attached[self.name] = np.ndarray(self.shape, dtype=self.dtype, buffer=Shm.buf)
+                _Attached[self.name + ':handle'] = Shm
+        return _Attached[self.name]
+
+    def release(self):
+        if self.storage == 'shm' and self._shm is not None:
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+        elif self.storage == 'memmap' and os.path.exists(self.name):
+            os.remove(self.name)
+
+
+_Attached = {}
+
+
+def make_folds(n, n_splits=5, shuffle=True, seed=1):
+    kfold = KFold(n_splits=n_splits, shuffle=shuffle, random_state=seed if shuffle else None)
+    return [(Train, Test) for Train, Test in kfold.split(np.empty((n, 1)))]
+
+
+def data_hash(X, y, Folds):
+    Hash = hashlib.sha1()
+    for Array in (X, y):
+        Array = np.ascontiguousarray(Array)
+        Hash.update(str((Array.shape, Array.dtype.str)).encode())
+        Hash.update(Array.data)
+    for Train, Test in Folds:
+        Hash.update(np.ascontiguousarray(Test).data)
+    return Hash.hexdigest()
+
+
+def params_key(estimator):
+    Params = sorted(estimator.get_params(deep=True).items())
+    return type(estimator).__name__ + repr(Params)
+
+
+class FoldCache:
+    """Fitted-fold results on disk, keyed by (data hash, model params, fold id, scoring)."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, Key):
+        return os.path.join(self.directory, hashlib.sha1(repr(Key).encode()).hexdigest() + '.pkl')
+
+    def get(self, Key):
+        try:
+            with open(self._path(Key), 'rb') as File:
+                return pickle.load(File)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None
+
+    def put(self, Key, Value):
+        Path = self._path(Key)
+        with open(Path + '.tmp', 'wb') as File:
+            pickle.dump(Value, File)
+        os.replace(Path + '.tmp', Path)
+
+
+def _fit_fold(Task):
+    Estimator, XShared, yShared, Train, Test, scoring, keep_model = Task
+    X = XShared.attach()
+    y = yShared.attach()
+    Start = time.perf_counter()
+    Estimator.fit(X[Train], y[Train])
+    FitTime = time.perf_counter() - Start
+    if scoring:
+        Score = get_scorer(scoring)(Estimator, X[Test], y[Test])
+    else:
+        Score = Estimator.score(X[Test], y[Test])
+    return {'score': Score, 'fit_time': FitTime, 'model': Estimator if keep_model else None}
+
+
+def cross_validate_grid(estimator, param_grid, X, y, n_splits=5, shuffle=True, seed=1,
+                        scoring=None, workers=1, cache_dir=None, keep_models=False,
+                        storage='shm', memmap_dir=None):
+    """Score every parameter setting on the same K folds, fitting folds in parallel.
+
+    X and y are placed once in shared memory (or .npy memmaps in memmap_dir)
+    and the workers read them in place. With cache_dir, every fitted fold is
+    stored under (data hash, params, fold id, scoring), so a re-run only fits
+    the folds whose key is new, plus any cached without a model when
+    keep_models is set. Returns one dict per (params, fold).
+    """
+    X = np.asarray(X)
+    y = np.asarray(y)
+    Folds = make_folds(X.shape[0], n_splits, shuffle, seed)
+    Hash = data_hash(X, y, Folds)
+    Cache = FoldCache(cache_dir) if cache_dir else None
+
+    Results = []
+    Pending = []
+    for Params in ParameterGrid(param_grid):
+        Estimator = clone(estimator).set_params(**Params)
+        PKey = params_key(Estimator)
+        for FoldId, (Train, Test) in enumerate(Folds):
+            Key = (Hash, PKey, FoldId, scoring)
+            Record = {'params': Params, 'fold': FoldId}
+            Hit = Cache.get(Key) if Cache else None
+            if Hit is not None and keep_models and Hit['model'] is None:
+                # cached without its model; refit so the caller gets one
+                Hit = None
+            if Hit is not None:
+                Record.update(Hit, cached=True)
+                if not keep_models:
+                    Record['model'] = None
+            else:
+                Pending.append((Key, Record, (clone(Estimator), Train, Test)))
+            Results.append(Record)
+    if not Pending:
+        return Results
+
+    if storage == 'memmap':
+        Dir = memmap_dir or '.'
+        XShared = SharedArray(X, 'memmap', os.path.join(Dir, 'cv_X_%s.npy' % Hash[:12]))
+        yShared = SharedArray(y, 'memmap', os.path.join(Dir, 'cv_y_%s.npy' % Hash[:12]))
+    else:
+        XShared = SharedArray(X)
+        yShared = SharedArray(y)
+    Pool = ProcessPoolExecutor(max_workers=workers) if workers != 1 else None
+    try:
+        Tasks = [(Est, XShared, yShared, Train, Test, scoring, keep_models)
+                 for _, _, (Est, Train, Test) in Pending]
+        Outputs = Pool.map(_fit_fold, Tasks) if Pool else map(_fit_fold, Tasks)
+        for (Key, Record, _), Output in zip(Pending, Outputs):
+            Record.update(Output, cached=False)
+            if Cache:
+                Cache.put(Key, Output)
+    finally:
+        if Pool:
+            Pool.shutdown()
+        _Attached.clear()
+        XShared.release()
+        yShared.release()
+    return Results
+
+
+def summarize(Results):
+    Table = {}
+    for Record in Results:
+        Table.setdefault(repr(sorted(Record['params'].items())), []).append(Record['score'])
+    return {Key: (np.mean(Scores), np.std(Scores)) for Key, Scores in Table.items()}
+
+
+if __name__ == '__main__':
+    import tempfile
+    from sklearn.linear_model import Ridge
+    from sklearn.neighbors import KNeighborsRegressor
+
+    Data = np.loadtxt(os.path.join(os.path.dirname(__file__) or '.', '..', 'Chapter09',
+                                   'airfoil_self_noise.dat'))
+    Data = (Data - Data.min(axis=0)) / (Data.max(axis=0) - Data.min(axis=0))
+    X, Y = Data[:, :5], Data[:, 5]
+    CacheDir = os.path.join(tempfile.gettempdir(), 'cv_fold_cache')
+    Workers = os.cpu_count() or 1
+
+    for Estimator, Grid in ((Ridge(), {'alpha': [0.01, 0.1, 1.0]}),
+                            (KNeighborsRegressor(), {'n_neighbors': [3, 5, 10]})):
+        Start = time.perf_counter()
+        Results = cross_validate_grid(Estimator, Grid, X, Y, scoring='neg_mean_squared_error',
+                                      workers=Workers, cache_dir=CacheDir)
+        Cached = sum(r['cached'] for r in Results)
+        print("%s: %d folds, %d from cache, %.2f s" %
+              (type(Estimator).__name__, len(Results), Cached, time.perf_counter() - Start))
+        for Params, (Mean, Std) in summarize(Results).items():
+            print("   %s  MSE = %.5f +/- %.5f" % (Params, -Mean, Std))
@@ -5,7 +5,7 @@ StartedData=np.arange(10,110,10)
 print(StartedData)
 
 
-kfold = KFold(5, True, 1)
+kfold = KFold(n_splits=5, shuffle=True, random_state=1)
 
 for TrainData, TestData in kfold.split(StartedData):
 	print("Train Data :", StartedData[TrainData],"Test Data :", StartedData[TestData])
@@ -0,0 +1,161 @@
+from collections import namedtuple
+
+import numpy as np
+
+BatchResult = namedtuple('BatchResult', ['x', 'fun', 'converged', 'iterations', 'history'])
+
+
+def _as_points(x0):
+    # (m,) for m scalar starts, or (m, d) for m starts in d dimensions
+    return np.array(x0, dtype=np.float64)
+
+
+def _record(History, Iteration, X, log_every):
+    if log_every and Iteration % log_every == 0:
+        History.append((Iteration, X.copy()))
+
+
+def _result(f, X, Converged, Iterations, History):
+    Fun = f(X) if f is not None else None
+    return BatchResult(X, Fun, Converged, Iterations, History)
+
+
+def gradient_descent(grad, x0, learning_rate=0.01, tol=1e-6, max_iter=10000, f=None,
+                     log_every=0):
+    """Plain gradient descent on every starting point at once.
+
+    grad maps an (m,) or (m, d) array of points to gradients of the same
+    shape. A point stops moving once its step is shorter than tol; the loop
+    ends when all have converged or after max_iter iterations. With
+    log_every = k the positions are recorded every k iterations.
+    """
+    X = _as_points(x0)
+    Active = np.ones(X.shape[0], dtype=bool)
+    Iterations = np.zeros(X.shape[0], dtype=np.int64)
+    History = []
+    for Iteration in range(1, max_iter + 1):
+        Step = learning_rate * grad(X[Active])
+        X[Active] -= Step
+        Iterations[Active] += 1
+        Size = np.abs(Step) if X.ndim == 1 else np.linalg.norm(Step, axis=1)
+        Active[np.flatnonzero(Active)[Size <= tol]] = False
+        _record(History, Iteration, X, log_every)
+        if not Active.any():
+            break
+    return _result(f, X, ~Active, Iterations, History)
+
+
+def momentum_descent(grad, x0, learning_rate=0.01, beta=0.9, tol=1e-6, max_iter=10000, f=None,
+                     log_every=0):
+    X = _as_points(x0)
+    V = np.zeros_like(X)
+    Active = np.ones(X.shape[0], dtype=bool)
+    Iterations = np.zeros(X.shape[0], dtype=np.int64)
+    History = []
+    for Iteration in range(1, max_iter + 1):
+        V[Active] = beta * V[Active] + learning_rate * grad(X[Active])
+        X[Active] -= V[Active]
+        Iterations[Active] += 1
+        Size = np.abs(V[Active]) if X.ndim == 1 else np.linalg.norm(V[Active], axis=1)
+        Active[np.flatnonzero(Active)[Size <= tol]] = False
+        _record(History, Iteration, X, log_every)
+        if not Active.any():
+            break
+    return _result(f, X, ~Active, Iterations, History)
+
+
+def adam(grad, x0, learning_rate=0.01, beta1=0.9, beta2=0.999, eps=1e-8, tol=1e-6,
+         max_iter=10000, f=None, log_every=0):
+    X = _as_points(x0)
+    M = np.zeros_like(X)
+    S = np.zeros_like(X)
+    Active = np.ones(X.shape[0], dtype=bool)
+    Iterations = np.zeros(X.shape[0], dtype=np.int64)
+    History = []
+    for Iteration in range(1, max_iter + 1):
+        # each point keeps its own step count for the bias correction
+        t = (Iterations[Active] + 1).astype(np.float64)
+        t = t if X.ndim == 1 else t[:, None]
+        G = grad(X[Active])
+        M[Active] = beta1 * M[Active] + (1 - beta1) * G
+        S[Active] = beta2 * S[Active] + (1 - beta2) * G**2
+        MHat = M[Active] / (1 - beta1**t)
+        SHat = S[Active] / (1 - beta2**t)
+        Step = learning_rate * MHat / (np.sqrt(SHat) + eps)
+        X[Active] -= Step
+        Iterations[Active] += 1
+        Size = np.abs(Step) if X.ndim == 1 else np.linalg.norm(Step, axis=1)
+        Active[np.flatnonzero(Active)[Size <= tol]] = False
+        _record(History, Iteration, X, log_every)
+        if not Active.any():
+            break
+    return _result(f, X, ~Active, Iterations, History)
+
+
+def newton(grad, hess, x0, tol=1e-6, max_iter=100, f=None, log_every=0):
+    """Newton iterations x <- x - H^-1 g on every starting point at once.
+
+    For scalar problems grad and hess return (m,) arrays; in d dimensions
+    grad returns (m, d) and hess (m, d, d), solved as one batched system.
+    Points with a singular Hessian are frozen and reported unconverged.
+    """
+    X = _as_points(x0)
+    Active = np.ones(X.shape[0], dtype=bool)
+    Failed = np.zeros(X.shape[0], dtype=bool)
+    Iterations = np.zeros(X.shape[0], dtype=np.int64)
+    History = []
+    for Iteration in range(1, max_iter + 1):
+        Idx = np.flatnonzero(Active)
+        G = grad(X[Idx])
+        H = hess(X[Idx])
+        if X.ndim == 1:
+            Singular = H == 0
+            Step = G / np.where(Singular, 1.0, H)
+        else:
+            Singular = np.abs(np.linalg.det(H)) < 1e-300
+            H = H.copy()
+            H[Singular] = np.eye(X.shape[1])
+            Step = np.linalg.solve(H, G[..., None])[..., 0]
+        Step[Singular] = 0
+        X[Idx] -= Step
+        Iterations[Idx] += 1
+        Size = np.abs(Step) if X.ndim == 1 else np.linalg.norm(Step, axis=1)
+        Failed[Idx[Singular]] = True
+        Active[Idx[(Size <= tol) | Singular]] = False
+        _record(History, Iteration, X, log_every)
+        if not Active.any():
+            break
+    return _result(f, X, ~Active & ~Failed, Iterations, History)
+
+
+if __name__ == '__main__':
+    import time
+
+    Gradf = lambda x: 2*x-2
+    Result = gradient_descent(Gradf, [3.0], learning_rate=0.01, tol=0.000001, log_every=100)
+    print("Number of iterations = ", Result.iterations[0])
+    print("X value of f(x) minimum = ", Result.x[0])
+
+    Starts = np.linspace(-100, 100, 10000)
+    Start = time.perf_counter()
+    Result = gradient_descent(Gradf, Starts, learning_rate=0.01, tol=0.000001)
+    print("10000 starts in %.3f s, all converged: %s, x in [%.6f, %.6f]" %
+          (time.perf_counter() - Start, Result.converged.all(), Result.x.min(), Result.x.max()))
+
+    FirstDerivative = lambda x: 3*x**2-4*x -1
+    SecondDerivative = lambda x: 6*x-4
+    f = lambda x: x**3 -2*x**2 -x + 2
+    Result = newton(FirstDerivative, SecondDerivative, np.linspace(0, 3, 7), f=f)
+    for x0, x, Fx, Ok in zip(np.linspace(0, 3, 7), Result.x, Result.fun, Result.converged):
+        print("start %.2f -> stationary point %.6f, f = %.6f, converged = %s" % (x0, x, Fx, Ok))
+
+    # Matyas function in two dimensions from many random starts
+    Matyas = lambda X: 0.26*(X[:, 0]**2+X[:, 1]**2)-0.48*X[:, 0]*X[:, 1]
+    MatyasGrad = lambda X: np.stack((0.52*X[:, 0]-0.48*X[:, 1], 0.52*X[:, 1]-0.48*X[:, 0]), axis=1)
+    MatyasHess = lambda X: np.broadcast_to([[0.52, -0.48], [-0.48, 0.52]], (X.shape[0], 2, 2))
+    X0 = np.random.default_rng(0).uniform(-10, 10, (1000, 2))
+    for Name, Res in (("Adam", adam(MatyasGrad, X0, learning_rate=0.1, f=Matyas)),
+                      ("Momentum", momentum_descent(MatyasGrad, X0, learning_rate=0.1, f=Matyas)),
+                      ("Newton", newton(MatyasGrad, MatyasHess, X0, f=Matyas))):
+        print("%-8s converged %d/1000, max iterations %d, worst f = %.2e" %
+              (Name, Res.converged.sum(), Res.iterations.max(), Res.fun.max()))
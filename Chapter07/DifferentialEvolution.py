@@ -0,0 +1,169 @@
+import os
+import pickle
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+DEResult = namedtuple('DEResult', ['x', 'fun', 'generations', 'evaluations', 'converged',
+                                   'history'])
+
+
+def _evaluate_block(Task):
+    f, Block = Task
+    return np.asarray(f(Block.T), dtype=np.float64)
+
+
+class DifferentialEvolution:
+    """DE/rand/1/bin global optimizer with whole-population objective calls.
+
+    f receives the population as coordinate rows, f([x0, x1, ...]) with each
+    x_i an array over individuals, exactly like the Chapter07 matyas function
+    is called on a meshgrid. With workers > 1 the population is split into
+    one block per worker and f must be picklable.
+    """
+
+    def __init__(self, f, bounds, pop_size=None, mutation=(0.5, 1.0), crossover=0.9,
+                 seed=None, workers=1):
+        self.f = f
+        self.bounds = np.asarray(bounds, dtype=np.float64)
+        self.d = self.bounds.shape[0]
+        self.pop_size = pop_size or max(10, 15 * self.d)
+        self.mutation = mutation
+        self.crossover = crossover
+        self.workers = workers
+        self.gen = np.random.default_rng(seed)
+        self.pool = None
+        Low, High = self.bounds[:, 0], self.bounds[:, 1]
+        self.population = Low + (High - Low) * self.gen.random((self.pop_size, self.d))
+        self.fitness = None
+        self.generation = 0
+        self.evaluations = 0
+        self.history = []
+
+    def evaluate(self, Population):
+        self.evaluations += Population.shape[0]
+        if self.workers == 1:
+            return _evaluate_block((self.f, Population))
+        if self.pool is None:
+            self.pool = ProcessPoolExecutor(max_workers=self.workers)
+        Blocks = np.array_split(Population, self.workers)
+        return np.concatenate(list(self.pool.map(_evaluate_block, [(self.f, b) for b in Blocks])))
+
+    def step(self):
+        n, d = self.population.shape
+        # three distinct partners per individual, none equal to the individual itself
+        Partners = np.argsort(self.gen.random((n, n - 1)), axis=1)[:, :3]
+        Partners += Partners >= np.arange(n)[:, None]
+        R1, R2, R3 = Partners.T
+        if np.ndim(self.mutation) == 0:
+            F = self.mutation
+        else:
+            F = self.gen.uniform(*self.mutation)  # dithering, one factor per generation
+        Mutant = self.population[R1] + F * (self.population[R2] - self.population[R3])
+        Low, High = self.bounds[:, 0], self.bounds[:, 1]
+        Mutant = np.clip(Mutant, Low, High)
+        Cross = self.gen.random((n, d)) < self.crossover
+        Cross[np.arange(n), self.gen.integers(0, d, n)] = True
+        Trial = np.where(Cross, Mutant, self.population)
+        TrialFitness = self.evaluate(Trial)
+        Better = TrialFitness <= self.fitness
+        self.population[Better] = Trial[Better]
+        self.fitness[Better] = TrialFitness[Better]
+        self.generation += 1
+
+    def save(self, path):
+        State = {'population': self.population, 'fitness': self.fitness,
+                 'generation': self.generation, 'evaluations': self.evaluations,
+                 'history': self.history, 'rng': self.gen.bit_generator.state}
+        with open(path + '.tmp', 'wb') as File:
+            pickle.dump(State, File)
+        os.replace(path + '.tmp', path)
+
+    def load(self, path):
+        with open(path, 'rb') as File:
+            State = pickle.load(File)
+        self.population = State['population']
+        self.fitness = State['fitness']
+        self.generation = State['generation']
+        self.evaluations = State['evaluations']
+        self.history = State['history']
+        self.gen.bit_generator.state = State['rng']
+        self.pop_size = self.population.shape[0]
+        return self
+
+    def run(self, max_generations=1000, tol=1e-8, atol=1e-12, stall_generations=None,
+            checkpoint=None, checkpoint_every=50):
+        """Evolve until converged, stalled or out of generations.
+
+        Stops when std(fitness) <= atol + tol * |mean(fitness)|, or when the best
+        value has not improved for stall_generations generations. If checkpoint
+        names an existing file, the run resumes from it; the state is written
+        there every checkpoint_every generations and at the end.
+        """
+        if checkpoint and os.path.exists(checkpoint):
+            self.load(checkpoint)
+        try:
+            if self.fitness is None:
+                self.fitness = self.evaluate(self.population)
+            Converged = False
+            Best = self.fitness.min()
+            Stall = 0
+            while self.generation < max_generations:
+                self.step()
+                Current = self.fitness.min()
+                self.history.append(Current)
+                Stall = Stall + 1 if Current >= Best else 0
+                Best = min(Best, Current)
+                if checkpoint and self.generation % checkpoint_every == 0:
+                    self.save(checkpoint)
+                if np.std(self.fitness) <= atol + tol * abs(np.mean(self.fitness)):
+                    Converged = True
+                    break
+                if stall_generations and Stall >= stall_generations:
+                    break
+            if checkpoint:
+                self.save(checkpoint)
+        finally:
+            if self.pool is not None:
+                self.pool.shutdown()
+                self.pool = None
+        i = np.argmin(self.fitness)
+        return DEResult(self.population[i].copy(), self.fitness[i], self.generation,
+                        self.evaluations, Converged, self.history)
+
+
+def matyas(x):
+    return 0.26*(x[0]**2+x[1]**2)-0.48*x[0]*x[1]
+
+
+def booth(x):
+    return (x[0]+2*x[1]-7)**2+(2*x[0]+x[1]-5)**2
+
+
+def rastrigin(x):
+    x = np.asarray(x)
+    return 10*x.shape[0] + (x**2 - 10*np.cos(2*np.pi*x)).sum(axis=0)
+
+
+if __name__ == '__main__':
+    import tempfile
+
+    # a low crossover rate suits separable multimodal surfaces such as Rastrigin
+    for Name, f, Bounds, CR in (("Matyas", matyas, [(-10, 10)] * 2, 0.9),
+                                ("Booth", booth, [(-10, 10)] * 2, 0.9),
+                                ("Rastrigin 10-D", rastrigin, [(-5.12, 5.12)] * 10, 0.2)):
+        Result = DifferentialEvolution(f, Bounds, crossover=CR, seed=1).run(max_generations=3000)
+        print("%-15s x = %s, f = %.3e, generations = %d, evaluations = %d, converged = %s" %
+              (Name, np.round(Result.x, 4), Result.fun, Result.generations, Result.evaluations,
+               Result.converged))
+
+    # stop after 100 generations, then resume from the checkpoint
+    Checkpoint = os.path.join(tempfile.gettempdir(), 'de_rastrigin.pkl')
+    if os.path.exists(Checkpoint):
+        os.remove(Checkpoint)
+    First = DifferentialEvolution(rastrigin, [(-5.12, 5.12)] * 10, crossover=0.2, seed=2)
+    print("after 100 generations f = %.3e" % First.run(100, checkpoint=Checkpoint).fun)
+    Resumed = DifferentialEvolution(rastrigin, [(-5.12, 5.12)] * 10, crossover=0.2, seed=2)
+    Result = Resumed.run(3000, checkpoint=Checkpoint)
+    print("resumed to generation %d, f = %.3e" % (Result.generations, Result.fun))
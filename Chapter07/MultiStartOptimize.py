@@ -0,0 +1,145 @@
+import os
+import time
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from scipy.optimize import minimize
+from scipy.stats import qmc
+
+MethodReport = namedtuple('MethodReport', ['method', 'minima', 'best', 'failures', 'nfev',
+                                           'evaluations', 'cache_hits', 'wall_time'])
+
+
+class MemoizedObjective:
+    """Objective wrapper with a bounded LRU cache keyed on x rounded to `decimals`."""
+
+    def __init__(self, f, maxsize=10000, decimals=10):
+        self.f = f
+        self.maxsize = maxsize
+        self.decimals = decimals
+        self.cache = OrderedDict()
+        self.evaluations = 0
+        self.hits = 0
+
+    def __call__(self, x):
+        Key = tuple(np.round(np.asarray(x, dtype=np.float64), self.decimals))
+        if Key in self.cache:
+            self.cache.move_to_end(Key)
+            self.hits += 1
+            return self.cache[Key]
+        Value = float(self.f(np.asarray(x)))
+        self.evaluations += 1
+        self.cache[Key] = Value
+        if len(self.cache) > self.maxsize:
+            self.cache.popitem(last=False)
+        return Value
+
+
+def generate_starts(bounds, n, method='sobol', seed=None):
+    Bounds = np.asarray(bounds, dtype=np.float64)
+    d = Bounds.shape[0]
+    if method == 'sobol':
+        U = qmc.Sobol(d, rng=seed).random(n)
+    elif method == 'lhs':
+        U = qmc.LatinHypercube(d, rng=seed).random(n)
+    elif method == 'random':
+        U = np.random.default_rng(seed).random((n, d))
+    else:
+        raise ValueError("method must be 'sobol', 'lhs' or 'random'")
+    return qmc.scale(U, Bounds[:, 0], Bounds[:, 1])
+
+
+def screen_starts(f, Candidates, n):
+    # one vectorized call over all candidates (f takes coordinate rows, like matyas([x, y]))
+    Values = np.asarray(f(Candidates.T))
+    return Candidates[np.argsort(Values)[:n]]
+
+
+def _run_starts(Task):
+    f, method, Starts, options, cache_size, decimals = Task
+    Objective = MemoizedObjective(f, cache_size, decimals)
+    Found = []
+    for x0 in Starts:
+        Res = minimize(Objective, x0, method=method, options=options)
+        Found.append((Res.x, Res.fun, Res.nfev, Res.success))
+    return Found, Objective.evaluations, Objective.hits
+
+
+def deduplicate(Found, fun_tol, x_tol):
+    # greedy clustering of converged points, best first; failed runs are not minima
+    Converged = [r for r in Found if r[3]] or [min(Found, key=lambda r: r[1])]
+    Minima = []
+    for x, Fun, _, _ in sorted(Converged, key=lambda r: r[1]):
+        for m in Minima:
+            if abs(Fun - m[1]) <= fun_tol * (1 + abs(m[1])) and np.linalg.norm(x - m[0]) <= x_tol:
+                m[2] += 1
+                break
+        else:
+            Minima.append([x, Fun, 1])
+    return [tuple(m) for m in Minima]
+
+
+def multi_start(f, bounds, n_starts=32, methods=('Nelder-Mead', 'Powell', 'BFGS'), starts='sobol',
+                candidates=None, workers=1, seed=None, options=None, cache_size=10000,
+                decimals=10, fun_tol=1e-6, x_tol=None):
+    """Run scipy.optimize.minimize from many starts for each method and compare cost.
+
+    Starts come from a Sobol, LHS or random design over bounds; with
+    candidates > n_starts the design is screened by one vectorized call of f
+    and the best n_starts are kept. Starts are split into one batch per
+    worker, and each batch shares a bounded LRU memo of objective values.
+    Runs that report failure are dropped; converged points whose objective
+    values agree within fun_tol (relative to 1 + |f|) and that lie within
+    x_tol of each other (by default 1% of the bounds' diagonal) count as one
+    minimum. Returns a MethodReport per method with the deduplicated minima as
+    (x, fun, hits), the number of failed runs, scipy's nfev total, real
+    objective evaluations, cache hits and wall time.
+    """
+    Starts = generate_starts(bounds, candidates or n_starts, starts, seed)
+    if candidates:
+        Starts = screen_starts(f, Starts, n_starts)
+    if x_tol is None:
+        x_tol = 0.01 * np.linalg.norm(np.ptp(np.asarray(bounds, dtype=np.float64), axis=1))
+    Batches = [b for b in np.array_split(Starts, workers) if len(b)]
+    Options = dict(options or {})
+    Pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    Reports = []
+    try:
+        for Method in methods:
+            Tasks = [(f, Method, b, Options.get(Method), cache_size, decimals) for b in Batches]
+            Begin = time.perf_counter()
+            Outputs = list(Pool.map(_run_starts, Tasks) if Pool else map(_run_starts, Tasks))
+            Wall = time.perf_counter() - Begin
+            Found = [r for Out in Outputs for r in Out[0]]
+            Minima = deduplicate(Found, fun_tol, x_tol)
+            Reports.append(MethodReport(Method, Minima, Minima[0], sum(not r[3] for r in Found),
+                                        sum(r[2] for r in Found),
+                                        sum(Out[1] for Out in Outputs),
+                                        sum(Out[2] for Out in Outputs), Wall))
+    finally:
+        if Pool:
+            Pool.shutdown()
+    return Reports
+
+
+def matyas(x):
+    return 0.26*(x[0]**2+x[1]**2)-0.48*x[0]*x[1]
+
+
+def booth(x):
+    return (x[0]+2*x[1]-7)**2+(2*x[0]+x[1]-5)**2
+
+
+if __name__ == '__main__':
+    Options = {'Nelder-Mead': {'xatol': 1e-8}, 'Powell': {'xtol': 1e-8}}
+    NStarts = 64
+    for Name, f in (("Matyas", matyas), ("Booth", booth)):
+        print(Name)
+        for Report in multi_start(f, [(-10, 10), (-10, 10)], n_starts=NStarts, candidates=1024,
+                                  workers=os.cpu_count() or 1, seed=1, options=Options):
+            x, Fun, Count = Report.best
+            print("  %-12s minimum at %s, f = %.2e, %d distinct minima, %d of %d runs failed, "
+                  "nfev = %d, evaluations = %d, cache hits = %d, wall time = %.3f s" %
+                  (Report.method, np.round(x, 6), Fun, len(Report.minima), Report.failures, NStarts,
+                   Report.nfev, Report.evaluations, Report.cache_hits, Report.wall_time))
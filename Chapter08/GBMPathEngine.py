@@ -0,0 +1,84 @@
+from collections import namedtuple
+
+import numpy as np
+
+GBMStatistics = namedtuple('GBMStatistics', ['terminal', 'running_max', 'mean_path'])
+
+
+def log_return_parameters(Close):
+    # drift and volatility of daily log returns, as in AmazonStockMontecarloSimulation.py
+    LogReturns = np.diff(np.log(np.asarray(Close, dtype=np.float64)))
+    return LogReturns.mean() - 0.5 * LogReturns.var(ddof=1), LogReturns.std(ddof=1)
+
+
+def _log_paths(Gen, S0, drift, sigma, steps, paths, dtype):
+    # row 0 is S0, row t holds the price after t daily returns
+    LogPrice = np.empty((steps, paths), dtype=dtype)
+    LogPrice[0] = np.log(S0)
+    Shocks = Gen.standard_normal((steps - 1, paths), dtype=dtype)
+    Shocks *= dtype(sigma)
+    Shocks += dtype(drift)
+    np.cumsum(Shocks, axis=0, out=LogPrice[1:])
+    LogPrice[1:] += LogPrice[0]
+    return LogPrice
+
+
+def gbm_paths(S0, drift, sigma, steps, paths, seed=None, dtype=np.float64):
+    """(steps, paths) price matrix with S[t] = S[t-1] * exp(drift + sigma * Z[t])."""
+    Gen = np.random.default_rng(seed)
+    return np.exp(_log_paths(Gen, S0, drift, sigma, steps, paths, np.dtype(dtype).type))
+
+
+def stream_gbm_statistics(S0, drift, sigma, steps, paths, chunk_paths=2000, seed=None,
+                          dtype=np.float64):
+    """Terminal price, running maximum and mean path of many GBM paths, chunk by chunk.
+
+    Only chunk_paths paths are held at a time, so memory is steps * chunk_paths
+    values however many paths are simulated. Each chunk draws from its own
+    SeedSequence child.
+    """
+    Type = np.dtype(dtype).type
+    Terminal = np.empty(paths, dtype=dtype)
+    RunningMax = np.empty(paths, dtype=dtype)
+    PriceSum = np.zeros(steps)
+    Sizes = [min(chunk_paths, paths - s) for s in range(0, paths, chunk_paths)]
+    for Start, Size, Seed in zip(range(0, paths, chunk_paths), Sizes,
+                                 np.random.SeedSequence(seed).spawn(len(Sizes))):
+        Gen = np.random.default_rng(Seed)
+        LogPrice = _log_paths(Gen, S0, drift, sigma, steps, Size, Type)
+        RunningMax[Start:Start + Size] = np.exp(LogPrice.max(axis=0))
+        Prices = np.exp(LogPrice, out=LogPrice)
+        Terminal[Start:Start + Size] = Prices[-1]
+        PriceSum += Prices.sum(axis=1, dtype=np.float64)
+    return GBMStatistics(Terminal, RunningMax, PriceSum / paths)
+
+
+if __name__ == '__main__':
+    import os
+    import tempfile
+    import time
+    import matplotlib.pyplot as plt
+    from MarketDataStore import CsvLoader, MarketDataStore
+
+    Store = MarketDataStore(os.path.join(tempfile.gettempdir(), 'market_data'), CsvLoader('.'))
+    AmznData = Store.frame('AMZN', ['Close'])
+    Drift, StdevLogReturns = log_return_parameters(AmznData['Close'])
+    print("Drift = ", Drift)
+
+    NumIntervals = 2518
+    StartStockPrice = AmznData['Close'].iloc[0]
+
+    StockPrice = gbm_paths(StartStockPrice, Drift, StdevLogReturns, NumIntervals, 20, seed=7)
+    plt.figure(figsize=(10, 5))
+    plt.plot(StockPrice)
+    plt.plot(np.array(AmznData['Close']), 'k*')
+    plt.show()
+
+    Start = time.perf_counter()
+    Stats = stream_gbm_statistics(StartStockPrice, Drift, StdevLogReturns, NumIntervals, 10**5,
+                                  chunk_paths=5000, seed=1, dtype=np.float32)
+    print("10^5 paths x %d steps in %.1f s" % (NumIntervals, time.perf_counter() - Start))
+    print("Mean terminal price = %.2f, 5%%/95%% quantiles = %s" %
+          (Stats.terminal.mean(), np.quantile(Stats.terminal, [0.05, 0.95])))
+    print("Mean running maximum = %.2f" % Stats.running_max.mean())
+    print("Actual final close = %.2f" % AmznData['Close'].iloc[-1])
@@ -0,0 +1,171 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+
+class CsvLoader:
+    """Offline loader for Yahoo-style CSV files (Date, Open, High, Low, Close, Adj Close, Volume).
+
+    Files are found as directory/pattern.format(ticker=...), e.g. AMZN.csv.
+    Any callable with the same signature, loader(ticker) -> (path or None,
+    DataFrame indexed by date), can be plugged into MarketDataStore instead.
+    """
+
+    def __init__(self, directory='.', pattern='{ticker}.csv', chunksize=None):
+        self.directory = directory
+        self.pattern = pattern
+        self.chunksize = chunksize
+
+    def path(self, ticker):
+        return os.path.join(self.directory, self.pattern.format(ticker=ticker))
+
+    def __call__(self, ticker):
+        Path = self.path(ticker)
+        Options = dict(header=0, index_col='Date', parse_dates=True, encoding='utf-8-sig')
+        if self.chunksize:
+            # chunked parsing keeps the text buffers small for very long histories
+            Data = pd.concat(pd.read_csv(Path, chunksize=self.chunksize, **Options))
+        else:
+            Data = pd.read_csv(Path, **Options)
+        return Path, Data
+
+
+def file_signature(Path):
+    Hash = hashlib.sha1()
+    with open(Path, 'rb') as File:
+        for Block in iter(lambda: File.read(1 << 20), b''):
+            Hash.update(Block)
+    return Hash.hexdigest()
+
+
+class MarketDataStore:
+    """Columnar on-disk cache of daily market data: one memory-mapped .npy per column.
+
+    Each ticker lives in root/TICKER/ with a datetime64[D] date index,
+    one float64 array per field and a meta.json that records the source file's
+    hash. Reads map the arrays instead of re-parsing text, and date ranges
+    are cut with searchsorted on the index. A ticker is (re)ingested through
+    the loader only when it is missing or its source file has changed.
+    """
+
+    def __init__(self, root, loader=None):
+        self.root = root
+        self.loader = loader if loader is not None else CsvLoader()
+        self._checked = {}
+        os.makedirs(root, exist_ok=True)
+
+    def _dir(self, ticker):
+        return os.path.join(self.root, ticker)
+
+    def _meta(self, ticker):
+        try:
+            with open(os.path.join(self._dir(ticker), 'meta.json')) as File:
+                return json.load(File)
+        except (OSError, ValueError):
+            return None
+
+    def _write_meta(self, ticker, Meta):
+        Dir = self._dir(ticker)
+        with open(os.path.join(Dir, 'meta.json.tmp'), 'w') as File:
+            json.dump(Meta, File)
+        os.replace(os.path.join(Dir, 'meta.json.tmp'), os.path.join(Dir, 'meta.json'))
+
+    def is_current(self, ticker):
+        # size and mtime first; the file is only re-hashed when those have changed
+        Meta = self._meta(ticker)
+        if Meta is None:
+            return False
+        Source = Meta.get('source')
+        if not Source or not os.path.exists(Source):
+            return True
+        Stat = os.stat(Source)
+        if [Stat.st_size, Stat.st_mtime] == Meta.get('stat'):
+            return True
+        if Meta.get('signature') != file_signature(Source):
+            return False
+        # same content under a new size/mtime: remember it so later checks skip the hash
+        Meta['stat'] = [Stat.st_size, Stat.st_mtime]
+        self._write_meta(ticker, Meta)
+        return True
+
+    def ingest(self, ticker, Data=None, source=None):
+        if Data is None:
+            source, Data = self.loader(ticker)
+        Data = Data.sort_index()
+        Dir = self._dir(ticker)
+        os.makedirs(Dir, exist_ok=True)
+        np.save(os.path.join(Dir, 'dates.npy'), Data.index.values.astype('datetime64[D]'))
+        Columns = []
+        for i, Column in enumerate(Data.columns):
+            np.save(os.path.join(Dir, 'col%d.npy' % i), Data[Column].to_numpy(dtype=np.float64))
+            Columns.append(Column)
+        Meta = {'columns': Columns, 'rows': len(Data),
+                'source': os.path.abspath(source) if source else None,
+                'signature': file_signature(source) if source else None,
+                'stat': [os.stat(source).st_size, os.stat(source).st_mtime] if source else None}
+        self._write_meta(ticker, Meta)
+        self._checked.pop(ticker, None)
+
+    def ensure(self, ticker):
+        if ticker not in self._checked:
+            if not self.is_current(ticker):
+                self.ingest(ticker)
+            self._checked[ticker] = self._meta(ticker)
+        return self._checked[ticker]
+
+    def _slice(self, ticker, start, end):
+        Dates = np.load(os.path.join(self._dir(ticker), 'dates.npy'), mmap_mode='r')
+        Lo = 0 if start is None else np.searchsorted(Dates, np.datetime64(start, 'D'), 'left')
+        Hi = len(Dates) if end is None else np.searchsorted(Dates, np.datetime64(end, 'D'), 'right')
+        return Dates, Lo, Hi
+
+    def arrays(self, ticker, fields=None, start=None, end=None):
+        """(dates, {field: values}) memory-mapped views for a date range, no copies."""
+        Meta = self.ensure(ticker)
+        Dates, Lo, Hi = self._slice(ticker, start, end)
+        Fields = Meta['columns'] if fields is None else fields
+        Out = {}
+        for Field in Fields:
+            i = Meta['columns'].index(Field)
+            Column = np.load(os.path.join(self._dir(ticker), 'col%d.npy' % i), mmap_mode='r')
+            Out[Field] = Column[Lo:Hi]
+        return Dates[Lo:Hi], Out
+
+    def frame(self, ticker, fields=None, start=None, end=None):
+        Dates, Columns = self.arrays(ticker, fields, start, end)
+        return pd.DataFrame({k: np.asarray(v) for k, v in Columns.items()},
+                            index=pd.DatetimeIndex(np.asarray(Dates), name='Date'))
+
+    def panel(self, tickers, field='Adj Close', start=None, end=None):
+        """One field for several tickers, outer-joined on date, like DataReader(...)[field]."""
+        Series = {}
+        for Ticker in tickers:
+            Dates, Columns = self.arrays(Ticker, [field], start, end)
+            Series[Ticker] = pd.Series(np.asarray(Columns[field]),
+                                       index=pd.DatetimeIndex(np.asarray(Dates), name='Date'))
+        return pd.DataFrame(Series)
+
+
+if __name__ == '__main__':
+    import tempfile
+    import time
+
+    Store = MarketDataStore(os.path.join(tempfile.gettempdir(), 'market_data'), CsvLoader('.'))
+
+    Start = time.perf_counter()
+    Store.ensure('AMZN')
+    print("First access (ingest or verify) took %.1f ms" % (1000 * (time.perf_counter() - Start)))
+
+    Start = time.perf_counter()
+    AmznData = Store.frame('AMZN', ['Close'])
+    print("Cached read took %.1f ms" % (1000 * (time.perf_counter() - Start)))
+    print(AmznData.tail())
+
+    Start = time.perf_counter()
+    Dates, Columns = Store.arrays('AMZN', ['Close', 'Volume'], '2019-01-01', '2019-12-31')
+    print("2019 slice: %d days, mean close %.2f, read in %.2f ms" %
+          (len(Dates), Columns['Close'].mean(), 1000 * (time.perf_counter() - Start)))
+    print(Store.panel(['AMZN'], 'Adj Close', '2020-03-01', '2020-03-10'))
@@ -0,0 +1,237 @@
+import numpy as np
+
+
+class GeometricBrownianMotion:
+    """dX = mu X dt + sigma X dW"""
+
+    def __init__(self, mu, sigma):
+        self.mu = mu
+        self.sigma = sigma
+
+    def drift(self, t, x):
+        return self.mu * x
+
+    def diffusion(self, t, x):
+        return self.sigma * x
+
+    def diffusion_dx(self, t, x):
+        return np.full_like(x, self.sigma)
+
+
+class OrnsteinUhlenbeck:
+    """dX = theta (mu - X) dt + sigma dW"""
+
+    def __init__(self, theta, mu, sigma):
+        self.theta = theta
+        self.mu = mu
+        self.sigma = sigma
+
+    def drift(self, t, x):
+        return self.theta * (self.mu - x)
+
+    def diffusion(self, t, x):
+        return np.full_like(x, self.sigma)
+
+    def diffusion_dx(self, t, x):
+        return np.zeros_like(x)
+
+
+class CoxIngersollRoss:
+    """dX = kappa (theta - X) dt + sigma sqrt(X) dW, with full truncation at zero."""
+
+    def __init__(self, kappa, theta, sigma):
+        self.kappa = kappa
+        self.theta = theta
+        self.sigma = sigma
+
+    def drift(self, t, x):
+        return self.kappa * (self.theta - np.maximum(x, 0))
+
+    def diffusion(self, t, x):
+        return self.sigma * np.sqrt(np.maximum(x, 0))
+
+    def diffusion_dx(self, t, x):
+        # d/dx sigma sqrt(x); Milstein only needs the product with the diffusion, sigma^2 / 2
+        return np.where(x > 0, 0.5 * self.sigma / np.sqrt(np.maximum(x, 1e-300)), 0.0)
+
+
+def brownian_paths(T, steps, paths, seed=None, dtype=np.float64, out=None):
+    """(steps + 1, paths) standard Brownian motion on a uniform grid, W[0] = 0."""
+    Gen = np.random.default_rng(seed)
+    W = np.empty((steps + 1, paths), dtype=dtype) if out is None else out
+    W[0] = 0
+    Gen.standard_normal((steps, paths), dtype=W.dtype.type, out=W[1:])
+    W[1:] *= np.sqrt(T / steps)
+    np.cumsum(W[1:], axis=0, out=W[1:])
+    return W
+
+
+def _integrate(drift, diffusion, diffusion_dx, x0, T, steps, paths, seed, out, record_every,
+               dtype, block):
+    if steps % record_every:
+        # otherwise the last row would not hold X(T)
+        raise ValueError("steps must be a multiple of record_every")
+    dt = T / steps
+    SqrtDt = np.sqrt(dt)
+    Records = steps // record_every + 1
+    X = np.empty((Records, paths), dtype=dtype) if out is None else out
+    Gen = np.random.default_rng(seed)
+    x = np.empty(paths, dtype=dtype)
+    x[...] = x0
+    X[0] = x
+    # normals are drawn `block` steps at a time; the time loop is vectorized over paths
+    for Begin in range(0, steps, block):
+        Size = min(block, steps - Begin)
+        dW = Gen.standard_normal((Size, paths), dtype=X.dtype.type)
+        dW *= SqrtDt
+        for j in range(Size):
+            i = Begin + j
+            t = i * dt
+            b = diffusion(t, x)
+            Step = drift(t, x) * dt + b * dW[j]
+            if diffusion_dx is not None:
+                Step += 0.5 * b * diffusion_dx(t, x) * (dW[j] ** 2 - dt)
+            x += Step
+            if (i + 1) % record_every == 0:
+                X[(i + 1) // record_every] = x
+    return X
+
+
+def euler_maruyama(drift, diffusion, x0, T, steps, paths, seed=None, out=None, record_every=1,
+                   dtype=np.float64, block=256):
+    """Euler-Maruyama paths of dX = drift(t, X) dt + diffusion(t, X) dW.
+
+    drift and diffusion take (t, x) with x the array of all paths at time t.
+    Every record_every-th step is written into out, preallocated with shape
+    (steps // record_every + 1, paths), which may be a np.memmap; steps must
+    be a multiple of record_every so that the last row is X(T).
+    """
+    return _integrate(drift, diffusion, None, x0, T, steps, paths, seed, out, record_every,
+                      dtype, block)
+
+
+def milstein(drift, diffusion, diffusion_dx, x0, T, steps, paths, seed=None, out=None,
+             record_every=1, dtype=np.float64, block=256):
+    """Milstein scheme; diffusion_dx(t, x) is the derivative of diffusion in x."""
+    return _integrate(drift, diffusion, diffusion_dx, x0, T, steps, paths, seed, out,
+                      record_every, dtype, block)
+
+
+def simulate(model, x0, T, steps, paths, scheme='euler', seed=None, out=None, record_every=1,
+             dtype=np.float64, block=256):
+    if scheme == 'euler':
+        return euler_maruyama(model.drift, model.diffusion, x0, T, steps, paths, seed, out,
+                              record_every, dtype, block)
+    if scheme == 'milstein':
+        return milstein(model.drift, model.diffusion, model.diffusion_dx, x0, T, steps, paths,
+                        seed, out, record_every, dtype, block)
+    raise ValueError("scheme must be 'euler' or 'milstein'")
+
+
+def stream_paths(model, x0, T, steps, paths, chunk_paths=10000, scheme='euler', seed=None,
+                 record_every=1, dtype=np.float64):
+    """Yield (first path index, chunk of paths) so that only chunk_paths paths are in memory."""
+    Sizes = [min(chunk_paths, paths - s) for s in range(0, paths, chunk_paths)]
+    Seeds = np.random.SeedSequence(seed).spawn(len(Sizes))
+    for Start, Size, Seed in zip(range(0, paths, chunk_paths), Sizes, Seeds):
+        yield Start, simulate(model, x0, T, steps, Size, scheme, Seed,
+                              record_every=record_every, dtype=dtype)
+
+
+def bridge_refine(t, W, where=None, levels=1, seed=None):
+    """Insert Brownian-bridge midpoints into the intervals of (t, W) that need them.
+
+    W has one row per time in t. where selects intervals: None for all, a
+    boolean array with one entry per interval, or a callable where(t, W)
+    returning one, which is evaluated again at every level. A midpoint is
+    (W[i] + W[i+1]) / 2 plus a normal with variance (t[i+1] - t[i]) / 4,
+    which keeps the refined path an exact sample of the same Brownian path.
+    A fixed selection keeps refining the halves of the intervals it chose.
+    """
+    Gen = np.random.default_rng(seed)
+    t = np.asarray(t, dtype=np.float64)
+    W = np.asarray(W)
+    if where is None:
+        Mask = np.ones(t.size - 1, dtype=bool)
+    elif not callable(where):
+        Mask = np.asarray(where, dtype=bool)
+    for _ in range(levels):
+        if callable(where):
+            Mask = np.asarray(where(t, W), dtype=bool)
+        Index = np.flatnonzero(Mask)
+        if Index.size == 0:
+            break
+        Dt = t[Index + 1] - t[Index]
+        Z = Gen.standard_normal((Index.size,) + W.shape[1:])
+        Scale = np.sqrt(Dt / 4).reshape((-1,) + (1,) * (W.ndim - 1))
+        Mid = 0.5 * (W[Index] + W[Index + 1]) + Scale * Z
+        t = np.insert(t, Index + 1, t[Index] + 0.5 * Dt)
+        W = np.insert(W, Index + 1, Mid, axis=0)
+        # with a fixed selection, both halves of a refined interval are refined again
+        Mask = np.insert(Mask, Index + 1, True)
+    return t, W
+
+
+def near_level(level, width):
+    """Interval selector for bridge_refine: any path within width of level at either end."""
+    def where(t, W):
+        Near = np.abs(W - level) <= width
+        Near = Near.reshape(Near.shape[0], -1).any(axis=1)
+        return Near[:-1] | Near[1:]
+    return where
+
+
+if __name__ == '__main__':
+    import time
+
+    T, Steps, Paths = 1.0, 1000, 10**5
+
+    Start = time.perf_counter()
+    W = brownian_paths(T, Steps, Paths, seed=4, dtype=np.float32)
+    print("Brownian motion, %d paths x %d steps in %.2f s: Var W(T) = %.4f (exact %.4f)" %
+          (Paths, Steps, time.perf_counter() - Start, W[-1].var(), T))
+    del W
+
+    Models = (("GBM", GeometricBrownianMotion(0.05, 0.2), 1.0),
+              ("OU", OrnsteinUhlenbeck(2.0, 1.0, 0.3), 0.0),
+              ("CIR", CoxIngersollRoss(1.5, 0.04, 0.2), 0.03))
+    for Name, Model, X0 in Models:
+        for Scheme in ('euler', 'milstein'):
+            Start = time.perf_counter()
+            X = simulate(Model, X0, T, Steps, Paths, Scheme, seed=1, record_every=100)
+            print("%-4s %-9s %d paths x %d steps in %.2f s: E[X(T)] = %.5f" %
+                  (Name, Scheme, Paths, Steps, time.perf_counter() - Start, X[-1].mean()))
+    print("exact means: GBM %.5f, OU %.5f, CIR %.5f" %
+          (np.exp(0.05), 1.0 - np.exp(-2.0), 0.04 + (0.03 - 0.04) * np.exp(-1.5)))
+
+    # strong error against the exact GBM solution on the same Brownian path
+    Model = GeometricBrownianMotion(0.05, 0.2)
+    for Scheme in ('euler', 'milstein'):
+        for n in (16, 64, 256):
+            X = simulate(Model, 1.0, T, n, 10**4, Scheme, seed=2)
+            Gen = np.random.default_rng(2)
+            WT = (Gen.standard_normal((n, 10**4)) * np.sqrt(T / n)).sum(axis=0)
+            Exact = np.exp((0.05 - 0.5 * 0.2**2) * T + 0.2 * WT)
+            print("%-9s steps = %4d  strong error = %.2e" %
+                  (Scheme, n, np.abs(X[-1] - Exact).mean()))
+
+    # streamed chunks: the running maximum of 10^5 OU paths without holding them all
+    Maxima = np.empty(Paths)
+    for First, Chunk in stream_paths(OrnsteinUhlenbeck(2.0, 1.0, 0.3), 0.0, T, Steps, Paths,
+                                     chunk_paths=20000, seed=3):
+        Maxima[First:First + Chunk.shape[1]] = Chunk.max(axis=0)
+    print("OU running maximum: mean %.4f" % Maxima.mean())
+
+    # refining every interval keeps the law of Brownian motion: Var of increments = dt
+    t = np.linspace(0, T, 17)
+    W = brownian_paths(T, 16, 10**4, seed=5)
+    t2, W2 = bridge_refine(t, W, levels=3, seed=6)
+    print("bridge refinement of all intervals: %d -> %d points, Var dW / dt = %.4f" %
+          (t.size, t2.size, np.diff(W2, axis=0).var() / np.diff(t2).mean()))
+
+    # refine one coarse path only where it comes close to its own maximum
+    W = W[:, :1]
+    Level = W.max()
+    t2, W2 = bridge_refine(t, W, near_level(Level, 0.1), levels=6, seed=7)
+    print("local refinement near %.3f: %d -> %d points, smallest step %.5f, max %.3f -> %.3f" %
+          (Level, t.size, t2.size, np.diff(t2).min(), Level, W2.max()))
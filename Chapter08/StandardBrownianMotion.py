@@ -5,7 +5,7 @@ np.random.seed(4)
 
 n = 1000
 
-SQN = 1/np.math.sqrt(n)
+SQN = 1/np.sqrt(n)
 
 ZValues = np.random.randn(n)
 
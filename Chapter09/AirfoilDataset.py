@@ -0,0 +1,201 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+from sklearn.model_selection import train_test_split
+
+ASNNames = ['Frequency', 'AngleAttack', 'ChordLength', 'FSVelox', 'SSDT', 'SSP']
+
+
+def file_signature(Path):
+    Hash = hashlib.sha1()
+    with open(Path, 'rb') as File:
+        for Block in iter(lambda: File.read(1 << 20), b''):
+            Hash.update(Block)
+    return Hash.hexdigest()
+
+
+class PreparedData:
+    """Pre-scaled airfoil arrays in a cache directory, opened as memory maps.
+
+    scaled.npy holds the min-max scaled rows with the training rows first,
+    so X_train, X_test, Y_train and Y_test are views into one mapped file and
+    nothing is copied when they are opened, including in worker processes
+    that receive only the directory path.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        with open(os.path.join(directory, 'meta.json')) as File:
+            self.meta = json.load(File)
+        self.columns = self.meta['columns']
+        self.data_min = np.array(self.meta['data_min'])
+        self.data_max = np.array(self.meta['data_max'])
+        self.n_train = self.meta['n_train']
+        self.scaled = np.load(os.path.join(directory, 'scaled.npy'), mmap_mode='r')
+
+    @property
+    def raw(self):
+        # parsed values in file order
+        return np.memmap(os.path.join(self.directory, 'raw.bin'), dtype=self.meta['dtype'],
+                         mode='r', shape=(self.meta['rows'], len(self.columns)))
+
+    @property
+    def X_train(self):
+        return self.scaled[:self.n_train, :-1]
+
+    @property
+    def X_test(self):
+        return self.scaled[self.n_train:, :-1]
+
+    @property
+    def Y_train(self):
+        return self.scaled[:self.n_train, -1]
+
+    @property
+    def Y_test(self):
+        return self.scaled[self.n_train:, -1]
+
+    def _range(self):
+        Range = self.data_max - self.data_min
+        Range[Range == 0] = 1  # as MinMaxScaler does for constant columns
+        return Range
+
+    def transform(self, X):
+        return (np.asarray(X) - self.data_min) / self._range()
+
+    def inverse_transform(self, X):
+        return np.asarray(X) * self._range() + self.data_min
+
+    def target_to_original(self, Y):
+        return np.asarray(Y) * self._range()[-1] + self.data_min[-1]
+
+    def frame(self):
+        return pd.DataFrame(np.asarray(self.scaled), columns=self.columns)
+
+
+def _ingest(path, directory, columns, chunksize, dtype):
+    # pass 1: parse chunks straight into a flat binary file, tracking column minima and maxima
+    Rows = 0
+    Low = np.full(len(columns), np.inf)
+    High = np.full(len(columns), -np.inf)
+    with open(os.path.join(directory, 'raw.bin'), 'wb') as Out:
+        for Chunk in pd.read_csv(path, sep=r'\s+', names=columns, header=None,
+                                 chunksize=chunksize):
+            Values = Chunk.to_numpy(dtype=dtype)
+            Values.tofile(Out)
+            Rows += Values.shape[0]
+            Low = np.minimum(Low, Values.min(axis=0))
+            High = np.maximum(High, Values.max(axis=0))
+    return Rows, Low, High
+
+
+def prepare(path='airfoil_self_noise.dat', cache_dir=None, test_size=0.30, random_state=5,
+            columns=ASNNames, chunksize=100000, dtype=np.float64):
+    """Parse, scale and split a whitespace-separated data file once, then reuse the result.
+
+    The cache entry is keyed by the file's sha1 and the split settings. A
+    missing entry is built chunk by chunk: rows are parsed into raw.bin while
+    the MinMaxScaler minima and maxima are accumulated, then the scaled rows
+    are written to scaled.npy in train_test_split order. The split uses the
+    same permutation as train_test_split(X, Y, test_size, random_state) in
+    the Chapter09 scripts. The entry is built in a temporary directory and
+    renamed into place, so concurrent callers never see a partial entry.
+    Returns a PreparedData.
+    """
+    cache_dir = cache_dir or os.path.join(tempfile.gettempdir(), 'airfoil_cache')
+    Settings = json.dumps([list(columns), test_size, random_state, np.dtype(dtype).str])
+    Key = file_signature(path)[:16] + '-' + hashlib.sha1(Settings.encode()).hexdigest()[:8]
+    Directory = os.path.join(cache_dir, Key)
+    if os.path.exists(os.path.join(Directory, 'meta.json')):
+        return PreparedData(Directory)
+    os.makedirs(cache_dir, exist_ok=True)
+    Work = tempfile.mkdtemp(prefix=Key + '.', dir=cache_dir)
+    try:
+        Rows, Low, High = _ingest(path, Work, columns, chunksize, dtype)
+        Raw = np.memmap(os.path.join(Work, 'raw.bin'), dtype=dtype, mode='r',
+                        shape=(Rows, len(columns)))
+        Train, Test = train_test_split(np.arange(Rows), test_size=test_size,
+                                       random_state=random_state)
+        Order = np.concatenate((Train, Test))
+        Range = High - Low
+        Range[Range == 0] = 1
+        # pass 2: scaled rows in split order, chunk by chunk
+        Scaled = np.lib.format.open_memmap(os.path.join(Work, 'scaled.npy'), mode='w+',
+                                           dtype=dtype, shape=(Rows, len(columns)))
+        for Start in range(0, Rows, chunksize):
+            Index = Order[Start:Start + chunksize]
+            Scaled[Start:Start + Index.size] = (Raw[Index] - Low) / Range
+        Scaled.flush()
+        del Scaled, Raw
+        Meta = {'columns': list(columns), 'rows': Rows, 'n_train': int(Train.size),
+                'data_min': Low.tolist(), 'data_max': High.tolist(),
+                'dtype': np.dtype(dtype).str, 'source': os.path.abspath(path),
+                'test_size': test_size, 'random_state': random_state}
+        with open(os.path.join(Work, 'meta.json'), 'w') as File:
+            json.dump(Meta, File)
+        try:
+            os.rename(Work, Directory)
+        except OSError:
+            # another process finished the same entry first
+            shutil.rmtree(Work, ignore_errors=True)
+    except BaseException:
+        shutil.rmtree(Work, ignore_errors=True)
+        raise
+    return PreparedData(Directory)
+
+
+def load(directory):
+    # for worker processes that are given only the cache directory
+    return PreparedData(directory)
+
+
+if __name__ == '__main__':
+    import time
+    from sklearn.linear_model import LinearRegression
+    from sklearn.metrics import mean_squared_error
+    from sklearn.preprocessing import MinMaxScaler
+
+    Start = time.perf_counter()
+    Data = prepare('airfoil_self_noise.dat')
+    print("prepare (build or open cache): %.1f ms" % (1000 * (time.perf_counter() - Start)))
+    Start = time.perf_counter()
+    Data = prepare('airfoil_self_noise.dat')
+    print("prepare (cached): %.1f ms, cache entry %s" %
+          (1000 * (time.perf_counter() - Start), Data.directory))
+    print('X train shape = ', Data.X_train.shape)
+    print('X test shape = ', Data.X_test.shape)
+
+    # the same arrays as the pandas/MinMaxScaler/train_test_split steps of the book scripts
+    ASNData = pd.read_csv('airfoil_self_noise.dat', sep=r'\s+', names=ASNNames)
+    ASNDataScaled = pd.DataFrame(MinMaxScaler().fit_transform(ASNData), columns=ASNNames)
+    X_train, X_test, Y_train, Y_test = train_test_split(
+        ASNDataScaled.drop('SSP', axis=1), ASNDataScaled['SSP'], test_size=0.30, random_state=5)
+    print("identical to the book pipeline: %s" %
+          all(np.allclose(a, b) for a, b in ((Data.X_train, X_train), (Data.X_test, X_test),
+                                             (Data.Y_train, Y_train), (Data.Y_test, Y_test))))
+
+    LModel = LinearRegression().fit(Data.X_train, Data.Y_train)
+    print('Linear Regression Model')
+    print(mean_squared_error(Data.Y_test, LModel.predict(Data.X_test)))
+
+    # chunked ingestion of a file 1000 times the size of the sample
+    Big = os.path.join(tempfile.gettempdir(), 'airfoil_x1000.dat')
+    if not os.path.exists(Big):
+        with open('airfoil_self_noise.dat', 'rb') as Source:
+            Block = Source.read()
+        with open(Big, 'wb') as Out:
+            for _ in range(1000):
+                Out.write(Block)
+    Start = time.perf_counter()
+    BigData = prepare(Big, chunksize=200000)
+    print("%d rows prepared or opened in %.1f s" % (BigData.meta['rows'],
+                                                    time.perf_counter() - Start))
+    Start = time.perf_counter()
+    BigData = load(BigData.directory)
+    print("reopened in %.1f ms, mean scaled SSP of the training rows %.4f" %
+          (1000 * (time.perf_counter() - Start), BigData.Y_train.mean()))
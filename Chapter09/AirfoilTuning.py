@@ -0,0 +1,198 @@
+import hashlib
+import math
+import os
+import pickle
+import time
+import warnings
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from sklearn.exceptions import ConvergenceWarning
+from sklearn.linear_model import LinearRegression
+from sklearn.metrics import mean_squared_error
+from sklearn.neural_network import MLPRegressor
+
+from AirfoilDataset import load, prepare
+
+Trial = namedtuple('Trial', ['model', 'params', 'budget', 'score', 'n_iter', 'fit_time', 'cached'])
+
+Models = {'mlp': MLPRegressor, 'linear': LinearRegression}
+
+
+class TrialStore:
+    """Finished trials on disk, keyed by (data, model, params, budget, seed)."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, Key):
+        return os.path.join(self.directory, hashlib.sha1(repr(Key).encode()).hexdigest() + '.pkl')
+
+    def get(self, Key):
+        try:
+            with open(self._path(Key), 'rb') as File:
+                return pickle.load(File)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None
+
+    def put(self, Key, Value):
+        Path = self._path(Key)
+        with open(Path + '.tmp', 'wb') as File:
+            pickle.dump(Value, File)
+        os.replace(Path + '.tmp', Path)
+
+
+def trial_key(DataKey, Model, Params, Budget, Seed):
+    # LinearRegression has no iteration budget, so one fit serves every rung
+    return (DataKey, Model, sorted(Params.items()), None if Model == 'linear' else Budget, Seed)
+
+
+def _run_trial(Task):
+    Directory, Model, Params, Budget, Seed, Validation = Task
+    Data = load(Directory)
+    X, Y = Data.X_train, Data.Y_train
+    n = X.shape[0] - int(round(Validation * X.shape[0]))
+    if Model == 'mlp':
+        Estimator = MLPRegressor(max_iter=Budget, random_state=Seed, **Params)
+    else:
+        Estimator = Models[Model](**Params)
+    Begin = time.perf_counter()
+    with warnings.catch_warnings():
+        # small budgets stop before convergence on purpose
+        warnings.simplefilter('ignore', ConvergenceWarning)
+        Estimator.fit(X[:n], Y[:n])
+    Elapsed = time.perf_counter() - Begin
+    Score = mean_squared_error(Y[n:], Estimator.predict(X[n:]))
+    return Score, getattr(Estimator, 'n_iter_', 0), Elapsed
+
+
+def sample_configs(n, Gen, space=None):
+    """n random MLPRegressor settings; space maps parameter names to lists of choices."""
+    space = space or {'hidden_layer_sizes': [(50,), (100,), (200,), (50, 50), (100, 100)],
+                      'activation': ['relu', 'tanh'],
+                      'solver': ['lbfgs', 'adam'],
+                      'alpha': [1e-5, 1e-4, 1e-3, 1e-2],
+                      'tol': [1e-4]}
+    Configs = []
+    for _ in range(n):
+        Configs.append(('mlp', {Name: Choices[Gen.integers(len(Choices))]
+                                for Name, Choices in space.items()}))
+    return Configs
+
+
+class HyperbandSearch:
+    """Successive halving and Hyperband over max_iter for the airfoil regressors.
+
+    Trials run in a process pool; each worker opens the prepared airfoil arrays
+    from the cache directory as memory maps and scores a configuration on the
+    last `validation` share of the training rows. Every finished trial is
+    stored in a TrialStore, so an interrupted search that is started again
+    reads the finished trials back instead of refitting them. Configurations
+    are trained from scratch at each budget.
+    """
+
+    def __init__(self, data=None, store_dir=None, workers=1, seed=0, validation=0.2, eta=3):
+        self.data = data if data is not None else prepare()
+        self.store = TrialStore(store_dir or os.path.join(self.data.directory, 'trials'))
+        self.workers = workers
+        self.seed = seed
+        self.validation = validation
+        self.eta = eta
+        self.trials = []
+        self.pool = None
+
+    def evaluate(self, Configs, Budget):
+        Key = os.path.basename(self.data.directory)
+        Keys = [trial_key(Key, m, p, Budget, self.seed) for m, p in Configs]
+        Results = [self.store.get(k) for k in Keys]
+        Missing = [i for i, r in enumerate(Results) if r is None]
+        Tasks = [(self.data.directory, Configs[i][0], Configs[i][1], Budget, self.seed,
+                  self.validation) for i in Missing]
+        if self.workers > 1 and len(Tasks) > 1:
+            if self.pool is None:
+                self.pool = ProcessPoolExecutor(max_workers=self.workers)
+            Outputs = self.pool.map(_run_trial, Tasks)
+        else:
+            Outputs = map(_run_trial, Tasks)
+        for i, Output in zip(Missing, Outputs):
+            self.store.put(Keys[i], Output)
+            Results[i] = Output
+        Trials = [Trial(m, p, Budget, r[0], r[1], r[2], i not in Missing)
+                  for i, ((m, p), r) in enumerate(zip(Configs, Results))]
+        self.trials.extend(Trials)
+        return Trials
+
+    def successive_halving(self, Configs, min_budget, max_budget):
+        """Run every config at min_budget and keep the best 1/eta at each eta-times larger budget."""
+        Budget = min_budget
+        while True:
+            Trials = self.evaluate(Configs, int(round(Budget)))
+            Ranked = sorted(Trials, key=lambda t: t.score)
+            if Budget * self.eta > max_budget * (1 + 1e-9) or len(Configs) <= 1:
+                return Ranked[0]
+            Configs = [(t.model, t.params) for t in Ranked[:max(1, len(Configs) // self.eta)]]
+            Budget *= self.eta
+
+    def hyperband(self, max_budget=2187, min_budget=27, space=None, baseline=True):
+        """Hyperband brackets from many cheap trials to a few full-budget ones; returns the best Trial."""
+        Gen = np.random.default_rng(self.seed)
+        s_max = int(math.floor(math.log(max_budget / min_budget, self.eta) + 1e-9))
+        Best = None
+        try:
+            for s in range(s_max, -1, -1):
+                n = int(math.ceil((s_max + 1) / (s + 1) * self.eta**s))
+                Configs = sample_configs(n, Gen, space)
+                if baseline:
+                    Configs.append(('linear', {}))
+                Winner = self.successive_halving(Configs, max_budget / self.eta**s, max_budget)
+                if Best is None or Winner.score < Best.score:
+                    Best = Winner
+        finally:
+            if self.pool is not None:
+                self.pool.shutdown()
+                self.pool = None
+        return Best
+
+    def refit(self, Best):
+        # the winning configuration on all training rows, scored on the test rows
+        if Best.model == 'mlp':
+            Estimator = MLPRegressor(max_iter=Best.budget, random_state=self.seed, **Best.params)
+        else:
+            Estimator = Models[Best.model](**Best.params)
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', ConvergenceWarning)
+            Estimator.fit(self.data.X_train, self.data.Y_train)
+        return Estimator, mean_squared_error(self.data.Y_test, Estimator.predict(self.data.X_test))
+
+
+if __name__ == '__main__':
+    import shutil
+    import tempfile
+
+    Data = prepare('airfoil_self_noise.dat')
+    StoreDir = os.path.join(tempfile.gettempdir(), 'airfoil_trials')
+    shutil.rmtree(StoreDir, ignore_errors=True)
+
+    for Run in ("first run", "resumed run"):
+        Search = HyperbandSearch(Data, StoreDir, workers=os.cpu_count() or 1, seed=1)
+        Start = time.perf_counter()
+        Best = Search.hyperband(max_budget=2187, min_budget=27)
+        Fitted = sum(not t.cached for t in Search.trials)
+        print("%s: %d trials (%d fitted, %d from the store) in %.1f s" %
+              (Run, len(Search.trials), Fitted, len(Search.trials) - Fitted,
+               time.perf_counter() - Start))
+    print("best: %s %s, max_iter = %d, validation MSE = %.5f" %
+          (Best.model, Best.params, Best.budget, Best.score))
+    Estimator, TestMSE = Search.refit(Best)
+    print("test MSE of the best configuration = %.5f" % TestMSE)
+
+    # the two models of Ch9.Airfoil Self-Noise.py for comparison
+    Book = MLPRegressor(hidden_layer_sizes=(50), activation='relu', solver='lbfgs', tol=1e-4,
+                        max_iter=10000, random_state=1).fit(Data.X_train, Data.Y_train)
+    print("book MLP (50), max_iter = 10000: test MSE = %.5f" %
+          mean_squared_error(Data.Y_test, Book.predict(Data.X_test)))
+    LModel = LinearRegression().fit(Data.X_train, Data.Y_train)
+    print("book linear regression: test MSE = %.5f" %
+          mean_squared_error(Data.Y_test, LModel.predict(Data.X_test)))
@@ -2,7 +2,7 @@ import pandas as pd
 
 ASNNames= ['Frequency','AngleAttack','ChordLength','FSVelox','SSDT','SSP']
 
-ASNData = pd.read_csv('airfoil_self_noise.dat', delim_whitespace=True, names=ASNNames)
+ASNData = pd.read_csv('airfoil_self_noise.dat', sep=r'\s+', names=ASNNames)
 
 print(ASNData.head(20))
 
@@ -17,7 +17,7 @@ from sklearn.preprocessing import MinMaxScaler
 
 ScalerObject = MinMaxScaler()
 print(ScalerObject.fit(ASNData))
-ASNDataScaled = ScalerObject.fit_transform(ASNData)
+ASNDataScaled = ScalerObject.transform(ASNData)
 ASNDataScaled = pd.DataFrame(ASNDataScaled, columns=ASNNames)
 
 summary = ASNDataScaled.describe()
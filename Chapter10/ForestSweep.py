@@ -0,0 +1,102 @@
+import itertools
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from SparseForestMDP import SparseMDPSolver, forest
+
+Parameters = ['S', 'r1', 'r2', 'p', 'gamma']
+
+
+def parameter_grid(S=(3,), r1=(4,), r2=(2,), p=(0.1,), gamma=(0.9,)):
+    # every combination, in lexicographic order so that neighbours are adjacent
+    return np.array(list(itertools.product(S, r1, r2, p, gamma)), dtype=np.float64)
+
+
+def resize_values(V, S):
+    # carry a value function over to a forest with S states, matching states by age
+    V = np.asarray(V)
+    New = V[np.minimum(np.arange(S), V.size - 1)]
+    New[-1] = V[-1]
+    return New
+
+
+def _solve_block(Task):
+    Points, Scale, method, options, warm = Task
+    Solved, Values, Rows = [], [], []
+    for Point in Points:
+        S, r1, r2, p, gamma = Point
+        P, R = forest(int(S), r1, r2, p)
+        Solver = SparseMDPSolver(P, R, gamma)
+        V0, Source = None, -1
+        if warm and Solved:
+            # nearest already-solved point in scaled parameter space
+            Distance = np.abs((np.array(Solved) - Point) / Scale).sum(axis=1)
+            Source = int(np.argmin(Distance))
+            V0 = resize_values(Values[Source], int(S))
+        Begin = time.perf_counter()
+        Solution = Solver.solve(method, V0=V0, **options)
+        Elapsed = time.perf_counter() - Begin
+        Rows.append((Solution.iter, Elapsed, Source >= 0, Solution.V, Solution.policy))
+        Solved.append(Point)
+        Values.append(Solution.V)
+    return Rows
+
+
+def sweep(points, method='policy', workers=1, blocks=None, warm=True, options=None):
+    """Solve the forest MDP at every (S, r1, r2, p, gamma) point of a grid.
+
+    points is an array with one row per point, e.g. from parameter_grid. The
+    rows are split into contiguous blocks (one per worker by default) that run
+    in a process pool; inside a block each solve is warm-started from the value
+    function of the nearest point already solved, measured in parameters
+    scaled by their range. Returns one DataFrame with a row per point:
+    the parameters, iter, time, warm, V and policy.
+    """
+    Points = np.atleast_2d(np.asarray(points, dtype=np.float64))
+    Scale = np.ptp(Points, axis=0)
+    Scale[Scale == 0] = 1
+    Blocks = [b for b in np.array_split(Points, blocks or workers) if len(b)]
+    Tasks = [(b, Scale, method, options or {}, warm) for b in Blocks]
+    if workers == 1:
+        Outputs = list(map(_solve_block, Tasks))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as Pool:
+            Outputs = list(Pool.map(_solve_block, Tasks))
+    Rows = [r for Out in Outputs for r in Out]
+    Table = pd.DataFrame(Points, columns=Parameters)
+    Table['S'] = Table['S'].astype(np.int64)
+    Table['iter'] = np.array([r[0] for r in Rows])
+    Table['time'] = np.array([r[1] for r in Rows])
+    Table['warm'] = np.array([r[2] for r in Rows])
+    Table['V'] = [r[3] for r in Rows]
+    Table['policy'] = [r[4] for r in Rows]
+    return Table
+
+
+if __name__ == '__main__':
+    import os
+
+    Grid = parameter_grid(S=(1000, 2000), r1=(2, 4, 6, 8), r2=(1, 2, 3),
+                          p=np.linspace(0.01, 0.2, 5), gamma=(0.9, 0.95))
+    Workers = os.cpu_count() or 1
+    for Method in ('value', 'policy'):
+        Results = {}
+        for Warm in (False, True):
+            Start = time.perf_counter()
+            Results[Warm] = sweep(Grid, Method, workers=Workers, warm=Warm)
+            print("%-6s %s: %d points in %.1f s (%.1f s in solves), %d iterations in total" %
+                  (Method, "warm" if Warm else "cold", len(Grid), time.perf_counter() - Start,
+                   Results[Warm]['time'].sum(), Results[Warm]['iter'].sum()))
+        # value iteration stops at an epsilon-optimal policy, which may differ in near-ties
+        Differ = sum(int((a != b).sum()) for a, b in zip(Results[False]['policy'],
+                                                          Results[True]['policy']))
+        print("       states with a different action warm vs cold: %d" % Differ)
+
+    Table = Results[True]
+    Table['V0'] = [V[0] for V in Table['V']]
+    Table['cut states'] = [int(Policy.sum()) for Policy in Table['policy']]
+    print(Table.drop(columns=['V', 'policy']).head(10))
+    print(Table.pivot_table(index='p', columns='gamma', values='cut states', aggfunc='mean'))
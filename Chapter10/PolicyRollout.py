@@ -0,0 +1,158 @@
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import scipy.sparse as sp
+from scipy.stats import norm
+
+from SparseForestMDP import SparseMDPSolver
+
+RolloutResult = namedtuple('RolloutResult', ['start', 'V', 'std_error', 'conf_int', 'n', 'horizon',
+                                             'event_fraction', 'event_time', 'action_frequency'])
+
+
+def forest_fire(State, Action, Next):
+    # in the forest MDP a fire is a 'Wait' that ends in state 0
+    return (Action == 0) & (Next == 0)
+
+
+def transition_lookup(Ppi):
+    # cumulative probabilities within each row, for sample_next
+    C = sp.csr_matrix(Ppi, dtype=np.float64)
+    C.eliminate_zeros()
+    Length = np.diff(C.indptr)
+    Order = np.argsort(-Length, kind='stable')
+    Longest = -Length[Order]
+    Cum = C.data.copy()
+    for k in range(1, int(Length.max())):
+        Entry = C.indptr[Order[:np.searchsorted(Longest, -k)]] + k
+        Cum[Entry] += Cum[Entry - 1]
+    Cum[C.indptr[1:] - 1] = 1.0
+    Depth = int(Length.max() - 1).bit_length()
+    return C.indptr.astype(np.int64), Cum, C.indices.astype(np.int64), Depth
+
+
+def sample_next(Lookup, Row, U):
+    # vectorized binary search for the first entry of each row with Cum > U
+    Indptr, Cum, Next, Depth = Lookup
+    Lo = Indptr[Row]
+    Hi = Indptr[Row + 1] - 1
+    for _ in range(Depth):
+        Mid = (Lo + Hi) >> 1
+        Right = Cum[Mid] <= U
+        Lo = np.where(Right, Mid + 1, Lo)
+        Hi = np.where(Right, Hi, Mid)
+    return Next[Lo]
+
+
+def _merge_moments(A, B):
+    # Chan et al. pairwise update of per-group (count, mean, M2)
+    Na, Ma, Qa = A
+    Nb, Mb, Qb = B
+    N = Na + Nb
+    Share = np.divide(Nb, N, out=np.zeros_like(Mb), where=N > 0)
+    Delta = Mb - Ma
+    return N, Ma + Delta * Share, Qa + Qb + Delta**2 * Na * Share
+
+
+def _rollout_chunk(Task):
+    Lookup, Rpi, policy, Starts, n_episodes, First, Size, gamma, horizon, event, Seed = Task
+    Gen = np.random.default_rng(Seed)
+    k = Starts.size
+    # episodes First .. First + Size - 1 of the flat (start, episode) order
+    Labels = np.arange(First, First + Size) // n_episodes
+    State = Starts[Labels]
+    Return = np.zeros(State.size)
+    Discount = 1.0
+    EventTime = np.zeros(State.size, dtype=np.int64)
+    Actions = np.zeros(int(policy.max()) + 1)
+    for t in range(horizon):
+        Return += Discount * Rpi[State]
+        Discount *= gamma
+        Action = policy[State]
+        Actions += np.bincount(Action, minlength=Actions.size)
+        NewState = sample_next(Lookup, State, Gen.random(State.size))
+        if event is not None:
+            EventTime[event(State, Action, NewState) & (EventTime == 0)] = t + 1
+        State = NewState
+    Count = np.bincount(Labels, minlength=k).astype(np.float64)
+    Mean = np.bincount(Labels, Return, k) / np.maximum(Count, 1)
+    M2 = np.bincount(Labels, (Return - Mean[Labels])**2, k)
+    Events = np.bincount(Labels, EventTime > 0, k)
+    return (Count, Mean, M2), Events, np.bincount(Labels, EventTime, k), Actions
+
+
+def rollout(P, R, policy, gamma, start=0, n_episodes=10**6, horizon=None, tol=1e-6,
+            chunk_size=2**17, workers=1, seed=None, confidence=0.95, event=None):
+    """Monte Carlo value of a fixed policy from simulated discounted episodes.
+
+    Episodes are integer state vectors stepped in lockstep. Next states are
+    drawn with one vectorized binary search per step within the cumulative
+    rows of P_pi.
+    Each episode is truncated after `horizon` steps; by default the horizon
+    keeps the truncation bias below tol * max|R| / (1 - gamma). start may be one
+    state or an array of states, each getting n_episodes episodes. Moments
+    are merged chunk by chunk, so memory stays bounded. event(State, Action,
+    Next) can flag an event such as forest_fire; the result gives the fraction
+    of episodes in which it happened (within the horizon) and its mean first
+    time. With workers > 1 event must be picklable.
+    """
+    Solver = SparseMDPSolver(P, R, gamma)
+    policy = np.asarray(policy, dtype=np.int64)
+    Ppi, Rpi = Solver.policy_matrices(policy)
+    Lookup = transition_lookup(Ppi)
+    if horizon is None:
+        horizon = int(np.ceil(np.log(tol) / np.log(gamma)))
+    Starts = np.atleast_1d(np.asarray(start, dtype=np.int64))
+    Total = Starts.size * n_episodes
+    Bounds = range(0, Total, chunk_size)
+    Seeds = np.random.SeedSequence(seed).spawn(len(Bounds))
+    Tasks = [(Lookup, Rpi, policy, Starts, n_episodes, b, min(chunk_size, Total - b), gamma,
+              horizon, event, ss) for b, ss in zip(Bounds, Seeds)]
+    k = Starts.size
+    Moments = (np.zeros(k), np.zeros(k), np.zeros(k))
+    Events, EventSum, Actions = np.zeros(k), np.zeros(k), np.zeros(Solver.A)
+    Pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        for PartMoments, PartEvents, PartEventSum, PartActions in (
+                Pool.map(_rollout_chunk, Tasks) if Pool else map(_rollout_chunk, Tasks)):
+            Moments = _merge_moments(Moments, PartMoments)
+            Events += PartEvents
+            EventSum += PartEventSum
+            Actions[:PartActions.size] += PartActions
+    finally:
+        if Pool:
+            Pool.shutdown()
+    N, Mean, M2 = Moments
+    StdError = np.sqrt(M2 / (N - 1) / N)
+    z = norm.ppf(0.5 + confidence / 2)
+    EventTime = np.divide(EventSum, Events, out=np.full(k, np.nan), where=Events > 0)
+    return RolloutResult(Starts, Mean, StdError,
+                         np.column_stack((Mean - z * StdError, Mean + z * StdError)),
+                         N.astype(np.int64), horizon, Events / N, EventTime,
+                         Actions / Actions.sum())
+
+
+if __name__ == '__main__':
+    import time
+    import mdptoolbox.example
+    import mdptoolbox.mdp
+
+    for Args in ((3, 4, 2, 0.1), (3, 4, 2, 0.8)):
+        P, R = mdptoolbox.example.forest(*Args)
+        gamma = 0.9
+        PolIterModel = mdptoolbox.mdp.PolicyIteration(P, R, gamma)
+        PolIterModel.run()
+        Start = time.perf_counter()
+        Result = rollout(P, R, PolIterModel.policy, gamma, start=[0, 1, 2], n_episodes=10**6,
+                         seed=1, event=forest_fire)
+        print("forest%s, policy %s: 3 x 10^6 episodes of %d steps in %.1f s" %
+              (Args, PolIterModel.policy, Result.horizon, time.perf_counter() - Start))
+        for i, s in enumerate(Result.start):
+            Low, High = Result.conf_int[i]
+            print("  state %d: V = %.4f +/- %.4f, 95%% CI [%.4f, %.4f], PolIterModel.V = %.4f, "
+                  "inside: %s" % (s, Result.V[i], Result.std_error[i], Low, High,
+                                  PolIterModel.V[s], Low <= PolIterModel.V[s] <= High))
+        print("  fire within the horizon in %s of episodes, first fire after %s years on average" %
+              (np.round(Result.event_fraction, 4), np.round(Result.event_time, 2)))
+        print("  action frequencies (wait, cut): %s" % np.round(Result.action_frequency, 4))
@@ -0,0 +1,199 @@
+import time
+from collections import namedtuple
+
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.linalg import gmres
+
+MDPSolution = namedtuple('MDPSolution', ['V', 'policy', 'iter', 'time', 'trace'])
+IterationRecord = namedtuple('IterationRecord', ['iteration', 'variation', 'changed', 'seconds'])
+
+
+def forest(S=3, r1=4, r2=2, p=0.1):
+    """Forest-management MDP of mdptoolbox.example.forest built directly in sparse form.
+
+    Returns P as a tuple of two (S, S) CSR matrices, Wait and Cut, and R as
+    an (S, 2) array, with the same values as mdptoolbox's dense (A, S, S)
+    example. Memory grows with 3S nonzeros, not with S^2.
+    """
+    if S <= 1:
+        raise ValueError("S must be greater than 1")
+    if not 0 < p < 1:
+        raise ValueError("p must be in ]0, 1[")
+    Rows = np.arange(S)
+    # Wait: fire to state 0 with probability p, otherwise one year older (capped at S-1)
+    Wait = sp.csr_matrix((np.tile([p, 1 - p], S),
+                          np.column_stack((np.zeros(S, dtype=np.int64),
+                                           np.minimum(Rows + 1, S - 1))).ravel(),
+                          np.arange(0, 2 * S + 1, 2)), shape=(S, S))
+    Cut = sp.csr_matrix((np.ones(S), np.zeros(S, dtype=np.int64), np.arange(S + 1)),
+                        shape=(S, S))
+    R = np.zeros((S, 2))
+    R[S - 1, 0] = r1
+    R[1:, 1] = 1
+    R[S - 1, 1] = r2
+    return (Wait, Cut), R
+
+
+class SparseMDPSolver:
+    """Value iteration, modified policy iteration and policy iteration on sparse P.
+
+    P is a sequence of A sparse (S, S) matrices (or a dense (A, S, S) array)
+    and R an (S, A) array. Policy evaluation is iterative: GMRES on
+    (I - gamma P_pi) V = R_pi, warm-started from the current values, or plain
+    Bellman sweeps. Each solve returns an MDPSolution whose trace holds one
+    IterationRecord per iteration: sup-norm value change, number of changed
+    actions and elapsed seconds.
+    """
+
+    def __init__(self, P, R, gamma):
+        self.P = [sp.csr_matrix(Pa) for Pa in P]
+        self.R = np.asarray(R, dtype=np.float64)
+        self.gamma = gamma
+        self.S, self.A = self.R.shape
+
+    def q_values(self, V):
+        return self.R + self.gamma * np.column_stack([Pa @ V for Pa in self.P])
+
+    def bellman(self, V):
+        Q = self.q_values(V)
+        Policy = Q.argmax(axis=1)
+        return Policy, Q[np.arange(self.S), Policy]
+
+    def policy_matrices(self, policy):
+        Ppi = sum(sp.diags((policy == a).astype(np.float64)) @ Pa for a, Pa in enumerate(self.P))
+        return sp.csr_matrix(Ppi), self.R[np.arange(self.S), policy]
+
+    def evaluate(self, policy, V0=None, tol=1e-10, max_iter=10000, method='gmres', restart=100):
+        Ppi, Rpi = self.policy_matrices(np.asarray(policy))
+        V = np.zeros(self.S) if V0 is None else np.asarray(V0, dtype=np.float64).copy()
+        if method == 'gmres':
+            Matrix = sp.identity(self.S, format='csr') - self.gamma * Ppi
+            V, Info = gmres(Matrix, Rpi, x0=V, rtol=tol, atol=0.0, restart=restart,
+                            maxiter=max_iter)
+            if Info > 0:
+                raise RuntimeError("policy evaluation did not converge in %d iterations" % Info)
+            return V
+        if method == 'sweeps':
+            for _ in range(max_iter):
+                Vnew = Rpi + self.gamma * (Ppi @ V)
+                if np.abs(Vnew - V).max() < tol:
+                    return Vnew
+                V = Vnew
+            return V
+        raise ValueError("method must be 'gmres' or 'sweeps'")
+
+    def _threshold(self, epsilon):
+        # sup-norm change below which the greedy policy is epsilon-optimal
+        return epsilon * (1 - self.gamma) / self.gamma
+
+    def value_iteration(self, epsilon=0.01, max_iter=1000, V0=None):
+        V = np.zeros(self.S) if V0 is None else np.asarray(V0, dtype=np.float64)
+        Policy = np.zeros(self.S, dtype=np.int64)
+        Trace = []
+        Begin = time.perf_counter()
+        for Iteration in range(1, max_iter + 1):
+            NewPolicy, Vnew = self.bellman(V)
+            Variation = np.abs(Vnew - V).max()
+            Trace.append(IterationRecord(Iteration, Variation, int((NewPolicy != Policy).sum()),
+                                         time.perf_counter() - Begin))
+            V, Policy = Vnew, NewPolicy
+            if Variation < self._threshold(epsilon):
+                break
+        return MDPSolution(V, Policy, Iteration, time.perf_counter() - Begin, Trace)
+
+    def modified_policy_iteration(self, epsilon=0.01, sweeps=20, max_iter=1000, V0=None):
+        """Greedy improvement followed by `sweeps` partial evaluation sweeps."""
+        V = np.zeros(self.S) if V0 is None else np.asarray(V0, dtype=np.float64)
+        Policy = np.zeros(self.S, dtype=np.int64)
+        Trace = []
+        Begin = time.perf_counter()
+        for Iteration in range(1, max_iter + 1):
+            NewPolicy, Vnew = self.bellman(V)
+            Variation = np.abs(Vnew - V).max()
+            Changed = int((NewPolicy != Policy).sum())
+            Policy = NewPolicy
+            if Variation < self._threshold(epsilon):
+                V = Vnew
+                Trace.append(IterationRecord(Iteration, Variation, Changed,
+                                             time.perf_counter() - Begin))
+                break
+            Ppi, Rpi = self.policy_matrices(Policy)
+            V = Vnew
+            for _ in range(sweeps):
+                V = Rpi + self.gamma * (Ppi @ V)
+            Trace.append(IterationRecord(Iteration, Variation, Changed,
+                                         time.perf_counter() - Begin))
+        return MDPSolution(V, Policy, Iteration, time.perf_counter() - Begin, Trace)
+
+    def policy_iteration(self, max_iter=1000, V0=None, policy0=None, tol=1e-10,
+                         evaluation='gmres'):
+        """Exact evaluation and greedy improvement until the policy stops changing.
+
+        Starts from policy0, or from the greedy policy of V0 (zeros by default).
+        """
+        V = np.zeros(self.S) if V0 is None else np.asarray(V0, dtype=np.float64)
+        Policy = self.bellman(V)[0] if policy0 is None else np.asarray(policy0)
+        Trace = []
+        Begin = time.perf_counter()
+        for Iteration in range(1, max_iter + 1):
+            Vnew = self.evaluate(Policy, V, tol, method=evaluation)
+            # keep the current action on ties so that the loop always terminates
+            Q = self.q_values(Vnew)
+            Greedy = Q.argmax(axis=1)
+            Rows = np.arange(self.S)
+            NewPolicy = np.where(Q[Rows, Greedy] > Q[Rows, Policy] + tol, Greedy, Policy)
+            Changed = int((NewPolicy != Policy).sum())
+            Trace.append(IterationRecord(Iteration, np.abs(Vnew - V).max(), Changed,
+                                         time.perf_counter() - Begin))
+            V, Policy = Vnew, NewPolicy
+            if Changed == 0:
+                break
+        return MDPSolution(V, Policy, Iteration, time.perf_counter() - Begin, Trace)
+
+    def solve(self, method='policy', **options):
+        Methods = {'value': self.value_iteration, 'modified': self.modified_policy_iteration,
+                   'policy': self.policy_iteration}
+        if method not in Methods:
+            raise ValueError("method must be 'value', 'modified' or 'policy'")
+        return Methods[method](**options)
+
+
+def print_trace(Solution, every=1):
+    print('  Iteration    Variation      Changed    Seconds')
+    for Record in Solution.trace[::every]:
+        print('  %9d    %12.6g    %7d    %8.4f' % Record)
+
+
+if __name__ == '__main__':
+    import mdptoolbox.example
+    import mdptoolbox.mdp
+
+    for Args in ((3, 4, 2, 0.1), (3, 4, 2, 0.8)):
+        P, R = forest(*Args)
+        Dense, DenseR = mdptoolbox.example.forest(*Args)
+        Solver = SparseMDPSolver(P, R, 0.9)
+        Solution = Solver.policy_iteration()
+        PolIterModel = mdptoolbox.mdp.PolicyIteration(Dense, DenseR, 0.9)
+        PolIterModel.run()
+        print("forest%s: sparse P equals dense P: %s" %
+              (Args, all(np.array_equal(P[a].toarray(), Dense[a]) for a in range(2))))
+        print("  V = %s, policy = %s, iter = %d" % (Solution.V, Solution.policy, Solution.iter))
+        print("  mdptoolbox V = %s, policy = %s" % (np.array(PolIterModel.V),
+                                                     PolIterModel.policy))
+
+    S = 10**5
+    Start = time.perf_counter()
+    P, R = forest(S, r1=4, r2=2, p=0.001)
+    Solver = SparseMDPSolver(P, R, 0.99)
+    print("\nforest with %d states built in %.2f s, %d nonzeros" %
+          (S, time.perf_counter() - Start, sum(Pa.nnz for Pa in P)))
+    Solutions = {}
+    for Method in ('value', 'modified', 'policy'):
+        Solutions[Method] = Solver.solve(Method)
+        Solution = Solutions[Method]
+        print("%-8s iterations = %4d  time = %.2f s  cut in %d states, V[0] = %.4f" %
+              (Method, Solution.iter, Solution.time, Solution.policy.sum(), Solution.V[0]))
+    print("max |V_value - V_policy| = %.2e" %
+          np.abs(Solutions['value'].V - Solutions['policy'].V).max())
+    print_trace(Solutions['policy'], every=20)
@@ -0,0 +1,144 @@
+import time
+from collections import namedtuple
+
+import numpy as np
+import scipy.sparse as sp
+
+from PolicyRollout import sample_next, transition_lookup
+
+LearningResult = namedtuple('LearningResult', ['Q', 'policy', 'V', 'steps', 'samples', 'time',
+                                               'trace'])
+TraceRecord = namedtuple('TraceRecord', ['step', 'epsilon', 'agreement', 'value_error'])
+
+
+class ForestEnvironments:
+    """N independent copies of an MDP, stepped together as integer state vectors.
+
+    P is (A, S, S) dense or a sequence of A sparse matrices, R is (S, A). The
+    learner only sees sampled (reward, next state) pairs. All actions share
+    one lookup table on the stacked rows of P, indexed by action * S + state.
+    """
+
+    def __init__(self, P, R, n_envs, seed=None):
+        self.R = np.asarray(R, dtype=np.float64)
+        self.S, self.A = self.R.shape
+        self.n_envs = n_envs
+        self.gen = np.random.default_rng(seed)
+        self._lookup = transition_lookup(sp.vstack([sp.csr_matrix(Pa) for Pa in P]))
+        self.state = self.gen.integers(0, self.S, n_envs)
+
+    def step(self, Action):
+        Row = Action * self.S + self.state
+        Reward = self.R[self.state, Action]
+        self.state = sample_next(self._lookup, Row, self.gen.random(self.n_envs))
+        return Reward, self.state
+
+
+def epsilon_greedy(Q, State, epsilon, Gen):
+    Action = Q[State].argmax(axis=1)
+    Explore = Gen.random(State.size) < epsilon
+    Action[Explore] = Gen.integers(0, Q.shape[1], Explore.sum())
+    return Action
+
+
+def learn(P, R, gamma, method='q-learning', n_envs=1024, steps=20000, alpha=0.1,
+          epsilon=(1.0, 0.05, 0.9995), seed=None, reference_policy=None, reference_V=None,
+          log_every=1000):
+    """Tabular Q-learning, SARSA or expected SARSA over n_envs environments in lockstep.
+
+    At every step all environments act epsilon-greedily on a shared Q table.
+    Their TD errors are scatter-added per (state, action) with np.bincount and
+    averaged, so Q moves by alpha times the mean TD error of each visited cell.
+    epsilon is (start, floor, decay per step). If a reference policy and/or
+    value function is given (e.g. PolIterModel.policy and PolIterModel.V), the
+    trace records the share of states where the greedy policy agrees and the
+    largest value error every log_every steps.
+    """
+    Env = ForestEnvironments(P, R, n_envs, seed)
+    Gen = np.random.default_rng(None if seed is None else seed + 1)
+    S, A = Env.S, Env.A
+    Q = np.zeros((S, A))
+    Eps, EpsMin, EpsDecay = epsilon
+    Trace = []
+    Begin = time.perf_counter()
+    State = Env.state
+    Action = epsilon_greedy(Q, State, Eps, Gen)
+    for t in range(1, steps + 1):
+        Reward, Next = Env.step(Action)
+        NextAction = epsilon_greedy(Q, Next, Eps, Gen)
+        if method == 'q-learning':
+            Future = Q[Next].max(axis=1)
+        elif method == 'sarsa':
+            Future = Q[Next, NextAction]
+        elif method == 'expected-sarsa':
+            QNext = Q[Next]
+            Future = (1 - Eps) * QNext.max(axis=1) + Eps * QNext.mean(axis=1)
+        else:
+            raise ValueError("method must be 'q-learning', 'sarsa' or 'expected-sarsa'")
+        Cell = State * A + Action
+        TD = Reward + gamma * Future - Q.flat[Cell]
+        Count = np.bincount(Cell, minlength=S * A)
+        Visited = Count > 0
+        Q.flat[Visited] += alpha * np.bincount(Cell, TD, S * A)[Visited] / Count[Visited]
+        State, Action = Next, NextAction
+        Eps = max(EpsMin, Eps * EpsDecay)
+        if log_every and (t % log_every == 0 or t == steps):
+            Agreement = np.nan if reference_policy is None else \
+                (Q.argmax(axis=1) == np.asarray(reference_policy)).mean()
+            Error = np.nan if reference_V is None else \
+                np.abs(Q.max(axis=1) - np.asarray(reference_V)).max()
+            Trace.append(TraceRecord(t, Eps, Agreement, Error))
+    return LearningResult(Q, Q.argmax(axis=1), Q.max(axis=1), steps, steps * n_envs,
+                          time.perf_counter() - Begin, Trace)
+
+
+def q_learning_loop(P, R, gamma, steps, alpha=0.1, epsilon=0.1, seed=None):
+    # one environment, one Python-level step at a time, for comparison
+    P = np.asarray(P)
+    S, A = np.shape(R)
+    Gen = np.random.default_rng(seed)
+    Q = np.zeros((S, A))
+    State = 0
+    for _ in range(steps):
+        Action = Gen.integers(A) if Gen.random() < epsilon else int(Q[State].argmax())
+        Next = Gen.choice(S, p=P[Action, State])
+        Q[State, Action] += alpha * (R[State, Action] + gamma * Q[Next].max() - Q[State, Action])
+        State = Next
+    return Q
+
+
+if __name__ == '__main__':
+    import mdptoolbox.example
+    import mdptoolbox.mdp
+
+    P, R = mdptoolbox.example.forest()
+    gamma = 0.9
+    PolIterModel = mdptoolbox.mdp.PolicyIteration(P, R, gamma)
+    PolIterModel.run()
+    print("PolIterModel.V = %s, policy = %s" % (np.round(PolIterModel.V, 3), PolIterModel.policy))
+
+    Start = time.perf_counter()
+    q_learning_loop(P, R, gamma, 20000, seed=1)
+    Loop = 20000 / (time.perf_counter() - Start)
+    print("per-step Python loop: %.0f samples per second" % Loop)
+
+    # SARSA and expected SARSA learn the value of the epsilon-greedy policy they follow,
+    # so with an epsilon floor of 0.05 their V stays below PolIterModel.V
+    for Method in ('q-learning', 'sarsa', 'expected-sarsa'):
+        Result = learn(P, R, gamma, Method, n_envs=1024, steps=10000, seed=1,
+                       reference_policy=PolIterModel.policy, reference_V=PolIterModel.V,
+                       log_every=2000)
+        print("%-15s %d samples in %.1f s (%.0f per second, %.0fx the loop)" %
+              (Method, Result.samples, Result.time, Result.samples / Result.time,
+               Result.samples / Result.time / Loop))
+        for Record in Result.trace:
+            print("  step %5d  epsilon %.3f  policy agreement %.2f  max |V - V*| %.3f" % Record)
+        print("  V = %s, policy = %s" % (np.round(Result.V, 3), Result.policy))
+
+    P, R = mdptoolbox.example.forest(3, 4, 2, 0.8)
+    PolIterModel = mdptoolbox.mdp.PolicyIteration(P, R, gamma)
+    PolIterModel.run()
+    Result = learn(P, R, gamma, 'q-learning', n_envs=1024, steps=10000, seed=1,
+                   reference_policy=PolIterModel.policy)
+    print("forest(3, 4, 2, 0.8): Q-learning policy %s, PolIterModel.policy %s" %
+          (Result.policy, PolIterModel.policy))